@@ -0,0 +1,68 @@
+import argparse
+import os
+import time
+import cv2
+import numpy as np
+from benchmarks.standin_models import ensure_standin
+
+GENDER_MEAN = (78.4263377603, 87.7689143744, 114.895847746)
+
+def classify_per_face(gender_net, faces):
+    # The original path: one blob and one forward pass per face
+    predictions = []
+    for face in faces:
+        blob = cv2.dnn.blobFromImage(face, 1.0, (227, 227), GENDER_MEAN, swapRB=False)
+        gender_net.setInput(blob)
+        predictions.append(gender_net.forward()[0].argmax())
+    return predictions
+
+def classify_batched(gender_net, faces, batch_size):
+    predictions = []
+    for start in range(0, len(faces), batch_size):
+        blob = cv2.dnn.blobFromImages(faces[start:start + batch_size], 1.0, (227, 227), GENDER_MEAN, swapRB=False)
+        gender_net.setInput(blob)
+        predictions.extend(pred.argmax() for pred in gender_net.forward())
+    return predictions
+
+def make_faces(count, rng):
+    # Face crops from a 640x480 frame are typically 40-160 px on a side
+    faces = []
+    for _ in range(count):
+        h, w = rng.integers(40, 160, size=2)
+        faces.append(rng.integers(0, 256, size=(h, w, 3), dtype=np.uint8))
+    return faces
+
+def median_ms(fn, repeats):
+    fn()  # Warm up allocations inside the net
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame gender classification latency, per-face vs batched")
+    parser.add_argument('--prototxt', default='gender_deploy.prototxt')
+    parser.add_argument('--model', default='gender_net.caffemodel')
+    parser.add_argument('--max-faces', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument('--standin', action='store_true', help="Use random weights when the trained model is missing")
+    args = parser.parse_args()
+
+    model = args.model
+    if args.standin and not os.path.exists(model):
+        model = ensure_standin(args.prototxt, 'bench_data')
+    gender_net = cv2.dnn.readNetFromCaffe(args.prototxt, model)
+    rng = np.random.default_rng(0)
+
+    print(f"{'faces':>5} {'per-face ms':>12} {'batched ms':>11} {'speedup':>8}")
+    for count in range(1, args.max_faces + 1):
+        faces = make_faces(count, rng)
+        old_ms = median_ms(lambda: classify_per_face(gender_net, faces), args.repeats)
+        new_ms = median_ms(lambda: classify_batched(gender_net, faces, args.batch_size), args.repeats)
+        print(f"{count:>5} {old_ms:>12.2f} {new_ms:>11.2f} {old_ms / new_ms:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
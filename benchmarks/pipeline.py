@@ -0,0 +1,176 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+import cv2
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from utils.video_processor import VideoProcessor
+from benchmarks.standin_models import ensure_standin
+from benchmarks.synthetic import StubDoorModel, StubFaceEmbedder, StubFaceNet, StubGenderNet, write_video
+from utils.face_gallery import FaceGallery
+
+STREAMS = ['door_detection', 'people_counting', 'cash_drawer', 'employee_detection', 'face_recognition']
+
+class StageCollector:
+    def __init__(self):
+        self.samples = defaultdict(lambda: defaultdict(list))
+
+    def __call__(self, stream_name, stage, seconds):
+        self.samples[stream_name][stage].append(seconds)
+
+def summarize(seconds):
+    ms = np.asarray(seconds) * 1000
+    return {
+        'count': int(ms.size),
+        'total_ms': round(float(ms.sum()), 3),
+        'mean_ms': round(float(ms.mean()), 4),
+        'p50_ms': round(float(np.percentile(ms, 50)), 4),
+        'p95_ms': round(float(np.percentile(ms, 95)), 4),
+    }
+
+def build_models(args):
+    if args.door_weights:
+        from ultralytics import YOLO
+        door_model = YOLO(args.door_weights)
+    else:
+        door_model = StubDoorModel(args.door_latency_ms)
+
+    # No stand-in for the Torch embedder; an empty gallery still exercises the full match
+    face_models = {'face_embedder': StubFaceEmbedder(),
+                   'face_gallery': FaceGallery(os.path.join(args.work_dir, 'face_gallery'))}
+    if args.models == 'stub':
+        return {'door_model': door_model, 'face_net': StubFaceNet(), 'gender_net': StubGenderNet(), **face_models}
+
+    # Real network graphs with seeded random weights: realistic cost, meaningless outputs
+    face_prototxt = os.path.join(REPO_ROOT, 'deploy.prototxt')
+    gender_prototxt = os.path.join(REPO_ROOT, 'gender_deploy.prototxt')
+    return {
+        'door_model': door_model,
+        'face_net': cv2.dnn.readNetFromCaffe(face_prototxt, ensure_standin(face_prototxt, args.work_dir)),
+        'gender_net': cv2.dnn.readNetFromCaffe(gender_prototxt, ensure_standin(gender_prototxt, args.work_dir)),
+        **face_models,
+    }
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def bench_stream(processor, collector, stream_name, video_path, frames):
+    cap = cv2.VideoCapture(video_path)
+    count = 0
+    started = time.perf_counter()
+    while count < frames:
+        read_started = time.perf_counter()
+        ret, frame = cap.read()
+        if not ret:
+            # Loop the clip so long runs do not depend on the synthesized length
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = cap.read()
+            if not ret:
+                break
+        collector(stream_name, 'read', time.perf_counter() - read_started)
+        processor.analyze_frame(stream_name, frame)
+        count += 1
+    elapsed = time.perf_counter() - started
+    cap.release()
+    return count, elapsed
+
+def run(args):
+    os.makedirs(args.work_dir, exist_ok=True)
+    np.random.seed(args.seed)
+    size = tuple(int(v) for v in args.size.split('x'))
+
+    processor = VideoProcessor(models=build_models(args))
+    collector = StageCollector()
+    processor.stage_sink = collector
+
+    report = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'config': vars(args),
+        'streams': {},
+    }
+
+    for stream_name in args.streams:
+        video_path = os.path.join(args.work_dir, f"{stream_name}_{args.size}_{args.video_frames}.avi")
+        if not os.path.exists(video_path):
+            write_video(video_path, stream_name, args.video_frames, size, seed=args.seed)
+
+        if args.no_motion_gate:
+            processor.set_motion_gate(stream_name, enabled=False)
+        if args.detection_interval:
+            processor.set_detection_schedule(stream_name, args.detection_interval)
+
+        frames, elapsed = bench_stream(processor, collector, stream_name, video_path, args.frames)
+        stream_report = {
+            'frames': frames,
+            'elapsed_s': round(elapsed, 4),
+            'fps': round(frames / elapsed, 2) if elapsed else None,
+            'stages': {stage: summarize(values) for stage, values in collector.samples[stream_name].items()},
+            'skipped_inferences': processor.get_skipped_inferences(stream_name),
+        }
+        if processor.schedulers(stream_name):
+            stream_report['detector_runs'] = processor.get_detector_runs(stream_name)
+        report['streams'][stream_name] = stream_report
+    return report
+
+def compare(report, baseline):
+    lines = [f"{'stream':<20} {'fps':>9} {'baseline':>9} {'change':>8}"]
+    for stream_name, current in report['streams'].items():
+        previous = baseline.get('streams', {}).get(stream_name)
+        if not previous or not previous.get('fps') or not current.get('fps'):
+            continue
+        change = (current['fps'] / previous['fps'] - 1) * 100
+        lines.append(f"{stream_name:<20} {current['fps']:>9.1f} {previous['fps']:>9.1f} {change:>+7.1f}%")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark VideoProcessor.analyze_frame on synthetic video")
+    parser.add_argument('--streams', nargs='+', default=STREAMS, choices=STREAMS)
+    parser.add_argument('--frames', type=int, default=300, help="Frames analyzed per stream")
+    parser.add_argument('--video-frames', type=int, default=300, help="Length of each synthesized clip")
+    parser.add_argument('--size', default='1280x720', help="Synthesized video resolution, WxH")
+    parser.add_argument('--models', choices=['stub', 'standin'], default='standin',
+                        help="stub: deterministic fakes; standin: real face/gender graphs with random weights")
+    parser.add_argument('--door-weights', help="Use a real YOLO weights file instead of the door stub")
+    parser.add_argument('--door-latency-ms', type=float, default=0.0, help="Simulated cost of a door stub call")
+    parser.add_argument('--detection-interval', type=int, help="Keyframe interval for door/face detectors")
+    parser.add_argument('--no-motion-gate', action='store_true')
+    parser.add_argument('--work-dir', default=os.path.join(REPO_ROOT, 'bench_data'))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='-', help="JSON report path ('-' is stdout)")
+    parser.add_argument('--baseline', help="Earlier JSON report to compare FPS against")
+    args = parser.parse_args()
+
+    report = run(args)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            print(compare(report, json.load(f)), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
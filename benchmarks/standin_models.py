@@ -0,0 +1,150 @@
+import os
+import re
+import numpy as np
+
+# Random-weight .caffemodel files built straight from the shipped prototxt files,
+# so the real network graphs can be timed without the trained weights.
+
+def _parse_prototxt(text):
+    text = re.sub(r'#.*', '', text)
+    tokens = re.findall(r'"[^"]*"|[{}:]|[^\s{}:"]+', text)
+    pos = 0
+
+    def parse_block():
+        nonlocal pos
+        block = []
+        while pos < len(tokens) and tokens[pos] != '}':
+            key = tokens[pos]
+            pos += 1
+            if tokens[pos] == ':':
+                pos += 1
+            if tokens[pos] == '{':
+                pos += 1
+                value = parse_block()
+                pos += 1
+            else:
+                value = tokens[pos].strip('"')
+                pos += 1
+            block.append((key, value))
+        return block
+
+    return parse_block()
+
+def _get(block, key, default=None):
+    for k, v in block:
+        if k == key:
+            return v
+    return default
+
+def _get_all(block, key):
+    return [v for k, v in block if k == key]
+
+def _varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+def _field(number, payload):
+    # Length-delimited protobuf field
+    return _varint((number << 3) | 2) + _varint(len(payload)) + payload
+
+def _blob(array):
+    array = np.ascontiguousarray(array, dtype='<f4')
+    shape = _field(1, b''.join(_varint(d) for d in array.shape))
+    return _field(5, array.tobytes()) + _field(7, shape)
+
+def _layer(name, layer_type, blobs):
+    payload = _field(1, name.encode()) + _field(2, layer_type.encode())
+    for array in blobs:
+        payload += _field(7, _blob(array))
+    return _field(100, payload)
+
+def _pool_dim(size, kernel, stride, pad):
+    return int(np.ceil((size + 2 * pad - kernel) / stride)) + 1
+
+def build_caffemodel(prototxt_path, seed=0):
+    with open(prototxt_path) as f:
+        net = _parse_prototxt(f.read())
+    rng = np.random.default_rng(seed)
+
+    shapes = {}
+    input_name = _get(net, 'input')
+    if input_name:
+        dims = _get_all(net, 'input_dim') or _get_all(_get(net, 'input_shape', []), 'dim')
+        shapes[input_name] = tuple(int(d) for d in dims[1:])
+
+    payload = b''
+    for layer in _get_all(net, 'layer'):
+        name, layer_type = _get(layer, 'name'), _get(layer, 'type')
+        bottoms, tops = _get_all(layer, 'bottom'), _get_all(layer, 'top')
+        in_shape = shapes.get(bottoms[0]) if bottoms else None
+        out_shape, blobs = in_shape, []
+
+        if layer_type == 'Input':
+            dims = _get_all(_get(_get(layer, 'input_param', []), 'shape', []), 'dim')
+            out_shape = tuple(int(d) for d in dims[1:])
+        elif layer_type == 'Convolution':
+            param = _get(layer, 'convolution_param', [])
+            num_output = int(_get(param, 'num_output'))
+            kernel = int(_get(param, 'kernel_size', _get(param, 'kernel_h', 1)))
+            stride = int(_get(param, 'stride', 1))
+            pad = int(_get(param, 'pad', 0))
+            dilation = int(_get(param, 'dilation', 1))
+            group = int(_get(param, 'group', 1))
+            c, h, w = in_shape
+            fan_in = c // group * kernel * kernel
+            blobs.append(rng.normal(0, np.sqrt(2.0 / fan_in), (num_output, c // group, kernel, kernel)))
+            if _get(param, 'bias_term', 'true') == 'true':
+                blobs.append(np.zeros(num_output))
+            effective = dilation * (kernel - 1) + 1
+            out_shape = (num_output, (h + 2 * pad - effective) // stride + 1, (w + 2 * pad - effective) // stride + 1)
+        elif layer_type == 'Pooling':
+            param = _get(layer, 'pooling_param', [])
+            c, h, w = in_shape
+            if _get(param, 'global_pooling') == 'true':
+                out_shape = (c, 1, 1)
+            else:
+                kernel = int(_get(param, 'kernel_size'))
+                stride = int(_get(param, 'stride', 1))
+                pad = int(_get(param, 'pad', 0))
+                out_shape = (c, _pool_dim(h, kernel, stride, pad), _pool_dim(w, kernel, stride, pad))
+        elif layer_type == 'InnerProduct':
+            num_output = int(_get(_get(layer, 'inner_product_param', []), 'num_output'))
+            fan_in = int(np.prod(in_shape))
+            blobs = [rng.normal(0, np.sqrt(1.0 / fan_in), (num_output, fan_in)), np.zeros(num_output)]
+            out_shape = (num_output, 1, 1)
+        elif layer_type == 'BatchNorm':
+            c = in_shape[0]
+            blobs = [np.zeros(c), np.ones(c), np.ones(1)]
+        elif layer_type == 'Scale':
+            c = in_shape[0]
+            blobs = [np.ones(c)]
+            if _get(_get(layer, 'scale_param', []), 'bias_term') == 'true':
+                blobs.append(np.zeros(c))
+        elif layer_type == 'Normalize':
+            blobs = [np.full(in_shape[0], 20.0)]
+
+        for top in tops:
+            shapes[top] = out_shape
+        if blobs:
+            payload += _layer(name, layer_type, blobs)
+    return payload
+
+def write_caffemodel(prototxt_path, output_path, seed=0):
+    with open(output_path, 'wb') as f:
+        f.write(build_caffemodel(prototxt_path, seed))
+    return output_path
+
+def ensure_standin(prototxt_path, output_dir, seed=0):
+    os.makedirs(output_dir, exist_ok=True)
+    base = os.path.splitext(os.path.basename(prototxt_path))[0]
+    output_path = os.path.join(output_dir, f"{base}.standin.caffemodel")
+    if not os.path.exists(output_path):
+        write_caffemodel(prototxt_path, output_path, seed)
+    return output_path
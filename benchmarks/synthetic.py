@@ -0,0 +1,155 @@
+import time
+import cv2
+import numpy as np
+
+# Synthetic scenes and deterministic stand-ins for the door, face and gender models.
+# Colors are BGR, as written by cv2.VideoWriter.
+DOOR_COLOR = (30, 70, 140)
+SKIN_COLOR = (120, 160, 220)
+
+def _background(size, rng):
+    w, h = size
+    noise = rng.integers(60, 200, size=(h // 8, w // 8, 3), dtype=np.uint8)
+    return cv2.resize(noise, size, interpolation=cv2.INTER_LINEAR)
+
+def _draw_door(frame, t):
+    h, w = frame.shape[:2]
+    # The door swings: its visible width shrinks and grows like a panel turning on its hinge
+    x1, y1, y2 = int(w * 0.35), int(h * 0.15), int(h * 0.95)
+    width = int(w * 0.25 * (0.55 + 0.45 * np.cos(t * 0.08)))
+    cv2.rectangle(frame, (x1, y1), (x1 + width, y2), DOOR_COLOR, -1)
+    cv2.circle(frame, (x1 + int(width * 0.85), (y1 + y2) // 2), max(3, w // 200), (40, 200, 230), -1)
+
+def _draw_faces(frame, t, count=4):
+    h, w = frame.shape[:2]
+    radius = max(12, h // 18)
+    for i in range(count):
+        cx = int((w * (i + 0.5) / count + t * (3 + i)) % w)
+        cy = int(h * (0.3 + 0.4 * ((i % 2) + 0.5 * np.sin(t * 0.05 + i)) / 1.5))
+        cv2.ellipse(frame, (cx, cy), (radius, int(radius * 1.3)), 0, 0, 360, SKIN_COLOR, -1)
+        for dx in (-radius // 3, radius // 3):
+            cv2.circle(frame, (cx + dx, cy - radius // 4), max(2, radius // 8), (20, 20, 20), -1)
+        cv2.ellipse(frame, (cx, cy + radius // 2), (radius // 3, radius // 8), 0, 0, 180, (40, 40, 120), 2)
+
+def _draw_counter(frame, t):
+    h, w = frame.shape[:2]
+    cv2.rectangle(frame, (int(w * 0.2), int(h * 0.6)), (int(w * 0.8), int(h * 0.9)), (90, 90, 90), -1)
+    # A hand reaches into the drawer for a short burst every few seconds
+    if (t // 45) % 3 == 0:
+        x = int(w * 0.3 + (t % 45) * w * 0.01)
+        cv2.ellipse(frame, (x, int(h * 0.65)), (w // 20, h // 25), 0, 0, 360, SKIN_COLOR, -1)
+
+SCENES = {
+    'door_detection': _draw_door,
+    'people_counting': _draw_faces,
+    'face_recognition': _draw_faces,
+    'cash_drawer': _draw_counter,
+    'employee_detection': _draw_counter,
+}
+
+def write_video(path, stream_name, frames=300, size=(1280, 720), fps=30, seed=0):
+    rng = np.random.default_rng(seed)
+    background = _background(size, rng)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, size)
+    draw = SCENES[stream_name]
+    for t in range(frames):
+        frame = background.copy()
+        draw(frame, t)
+        writer.write(frame)
+    writer.release()
+    return path
+
+def _color_mask(bgr, color, tolerance=12):
+    lower = np.clip(np.array(color) - tolerance, 0, 255).astype(np.uint8)
+    upper = np.clip(np.array(color) + tolerance, 0, 255).astype(np.uint8)
+    return cv2.inRange(bgr, lower, upper)
+
+class _Array:
+    # Mimics the torch tensor API the door branch calls: .cpu().numpy()
+    def __init__(self, array):
+        self.array = array
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+class _Box:
+    def __init__(self, xyxy):
+        self.xyxy = [_Array(np.array(xyxy, dtype=np.float32))]
+
+class _Result:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+class StubDoorModel:
+    # Finds the painted door by color; latency_ms emulates the cost of a real YOLO pass
+    def __init__(self, latency_ms=0.0):
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def __call__(self, rgb_frame):
+        self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        mask = _color_mask(rgb_frame[:, :, ::-1], DOOR_COLOR)
+        points = cv2.findNonZero(mask)
+        if points is None:
+            return [_Result([])]
+        x, y, w, h = cv2.boundingRect(points)
+        return [_Result([_Box([x, y, x + w, y + h])])]
+
+class StubFaceNet:
+    # Returns SSD-shaped detections for the skin-colored patches in the input blob
+    def __init__(self, mean=(104.0, 177.0, 123.0)):
+        self.mean = np.array(mean, dtype=np.float32)
+        self.blob = None
+        self.calls = 0
+
+    def setInput(self, blob):
+        self.blob = blob
+
+    def forward(self):
+        self.calls += 1
+        image = self.blob[0].transpose(1, 2, 0) + self.mean
+        mask = _color_mask(np.clip(image, 0, 255).astype(np.uint8), SKIN_COLOR, tolerance=20)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+        h, w = mask.shape
+        detections = np.zeros((1, 1, max(count - 1, 1), 7), dtype=np.float32)
+        for i in range(1, count):
+            x, y, bw, bh, area = stats[i]
+            if area < 20:
+                continue
+            detections[0, 0, i - 1] = (0, 1, 0.99, x / w, y / h, (x + bw) / w, (y + bh) / h)
+        return detections
+
+class StubFaceEmbedder:
+    # Deterministic 128-d embeddings from a coarse thumbnail of each face in the batch
+    def __init__(self):
+        self.blob = None
+        self.calls = 0
+
+    def setInput(self, blob):
+        self.blob = blob
+
+    def forward(self):
+        self.calls += 1
+        thumbnails = [cv2.resize(face.transpose(1, 2, 0), (8, 16)).mean(axis=2) for face in self.blob]
+        return np.stack(thumbnails).reshape(len(self.blob), 128).astype(np.float32)
+
+class StubGenderNet:
+    # Deterministic labels from mean brightness, one row per face in the batch
+    def __init__(self):
+        self.blob = None
+        self.calls = 0
+
+    def setInput(self, blob):
+        self.blob = blob
+
+    def forward(self):
+        self.calls += 1
+        brightness = self.blob.reshape(self.blob.shape[0], -1).mean(axis=1)
+        preds = np.zeros((self.blob.shape[0], 2), dtype=np.float32)
+        preds[np.arange(len(preds)), (brightness > 0).astype(int)] = 1.0
+        return preds
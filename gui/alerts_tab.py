@@ -1,18 +1,112 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QListWidget, QListWidgetItem
-from PyQt5.QtCore import QDateTime
+from collections import OrderedDict
+from datetime import datetime
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QListView
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QTimer
+
+class AlertsModel(QAbstractListModel):
+    # Newest-first view of the event store. Rows are fetched a page at a time and only a few pages
+    # are kept, so memory stays flat however long the history gets.
+    def __init__(self, event_store, page_size=200, max_pages=8, **filters):
+        super().__init__()
+        self.event_store = event_store
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.filters = filters
+        self.pages = OrderedDict()
+        # Row indexes are counted from this id down, so rows committed later do not shift them
+        self.anchor_id = event_store.last_id
+        self.total = event_store.count(max_id=self.anchor_id, **filters)
+        self.reset_pages()
+
+    def reset_pages(self):
+        # Pages are fetched by id (keyset), so each needs the newest id on it. Fetching a page gives the
+        # next page's; a jump ahead walks the pages in between with skip_id. Unfiltered ids below the
+        # anchor are usually gap-free (pruning only removes the oldest), and then every page is known.
+        self.pages.clear()
+        self.page_ends = {0: self.anchor_id}
+        oldest = self.event_store.query(limit=1, newest_first=False, max_id=self.anchor_id, **self.filters)
+        self.dense = not self.filters and bool(oldest) and self.anchor_id - oldest[0][0] + 1 == self.total
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.total
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        row = self.row(index.row())
+        if row is None:
+            return None
+        _, timestamp, camera, _, message, _ = row
+        text = f"{datetime.fromtimestamp(timestamp):%Y-%m-%d %H:%M:%S} - "
+        if camera:
+            text += f"[{camera}] "
+        return text + message
+
+    def page_end(self, page_index):
+        if self.dense:
+            return self.anchor_id - page_index * self.page_size
+        known = max(index for index in self.page_ends if index <= page_index)
+        end = self.page_ends[known]
+        for index in range(known + 1, page_index + 1):
+            end = self.event_store.skip_id(end, self.page_size, **self.filters)
+            if end is None:
+                return None
+            self.page_ends[index] = end
+        return end
+
+    def row(self, row):
+        page_index = row // self.page_size
+        page = self.pages.get(page_index)
+        if page is None:
+            end = self.page_end(page_index)
+            page = [] if end is None else self.event_store.query(limit=self.page_size, max_id=end, **self.filters)
+            if len(page) == self.page_size:
+                self.page_ends.setdefault(page_index + 1, page[-1][0] - 1)
+            self.pages[page_index] = page
+            if len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+        else:
+            self.pages.move_to_end(page_index)
+        offset = row % self.page_size
+        return page[offset] if offset < len(page) else None
+
+    def refresh(self):
+        # Rows committed since the last refresh are inserted at the top
+        newest_id = self.event_store.last_id
+        if newest_id == self.anchor_id:
+            return 0
+        added = self.event_store.count(min_id=self.anchor_id + 1, max_id=newest_id, **self.filters)
+        self.anchor_id = newest_id
+        self.total += added
+        self.reset_pages()
+        if added:
+            self.beginInsertRows(QModelIndex(), 0, added - 1)
+            self.endInsertRows()
+        return added
 
 class AlertsTab(QWidget):
-    def __init__(self):
+    def __init__(self, event_store):
         super().__init__()
+        self.event_store = event_store
         layout = QVBoxLayout()
         self.setLayout(layout)
 
-        self.alerts_list = QListWidget()
+        self.alerts_model = AlertsModel(event_store)
+        self.alerts_list = QListView()
+        self.alerts_list.setModel(self.alerts_model)
+        self.alerts_list.setUniformItemSizes(True)  # Lets the view lay out only the visible rows
         self.alerts_list.setStyleSheet("background-color: #3B4252; color: #ECEFF4;")
         layout.addWidget(self.alerts_list)
 
-    def add_alert(self, message):
-        timestamp = QDateTime.currentDateTime().toString("yyyy-MM-dd hh:mm:ss")
-        item = QListWidgetItem(f"{timestamp} - {message}")
-        self.alerts_list.insertItem(0, item)  # Add new alerts at the top
-        self.alerts_list.scrollToTop()
\ No newline at end of file
+        # The store commits in batches on its own thread; pick up new rows a couple of times a second
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(500)
+
+    def add_alert(self, message, camera=None, alert_type='alert'):
+        self.event_store.add(alert_type, message, camera=camera)
+
+    def refresh(self):
+        at_top = self.alerts_list.verticalScrollBar().value() == 0
+        if self.alerts_model.refresh() and at_top:
+            self.alerts_list.scrollToTop()  # Newest alerts are at the top
@@ -1,6 +1,7 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QHBoxLayout
-from PyQt5.QtGui import QImage, QPixmap
 from PyQt5.QtCore import Qt
+from gui.video_label import VideoLabel
+from gui.result_events import ResultEvents
 
 class CashDrawerTab(QWidget):
     def __init__(self, video_processor, stream_name):
@@ -12,7 +13,7 @@ class CashDrawerTab(QWidget):
         self.setLayout(layout)
 
         # Video feed
-        self.video_label = QLabel()
+        self.video_label = VideoLabel()
         self.video_label.setAlignment(Qt.AlignCenter)
         self.video_label.setStyleSheet("border: 2px solid #4C566A; background-color: #2E3440;")
         layout.addWidget(self.video_label)
@@ -29,16 +30,17 @@ class CashDrawerTab(QWidget):
 
         layout.addLayout(status_layout)
 
-    def update_frame(self):
-        frame, detections = self.video_processor.process_frame(self.stream_name)
-        if frame is not None:
-            h, w, ch = frame.shape
-            bytes_per_line = ch * w
-            qt_image = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(qt_image)
-            self.video_label.setPixmap(pixmap.scaled(self.video_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        self.video_processor.subscribe(stream_name, self.update_frame)
+        self.result_events = ResultEvents(video_processor, stream_name)
+        self.result_events.changed.connect(self.update_results)
 
-        is_open = self.video_processor.results[self.stream_name]
+    def update_frame(self, seq, frame, detections):
+        self.video_label.show_frame(frame)
+
+    def update_results(self, changes):
+        if 'value' not in changes:
+            return
+        is_open = changes['value']
         status = "Open" if is_open else "Closed"
         color = "#BF616A" if is_open else "#A3BE8C"  # Red if open, green if closed
         icon = "🔓" if is_open else "🔒"
@@ -1,6 +1,8 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QHBoxLayout
-from PyQt5.QtGui import QImage, QPixmap
 from PyQt5.QtCore import Qt, QSize
+from gui.video_label import VideoLabel
+from gui.result_events import ResultEvents
+from gui.trend_chart import TrendChart
 
 class DoorDetectionTab(QWidget):
     def __init__(self, video_processor, stream_name):
@@ -12,7 +14,7 @@ class DoorDetectionTab(QWidget):
         self.setLayout(layout)
 
         # Video feed
-        self.video_label = QLabel()
+        self.video_label = VideoLabel()
         self.video_label.setAlignment(Qt.AlignCenter)
         self.video_label.setStyleSheet("border: 2px solid #4C566A; background-color: #2E3440;")
         self.video_label.setFixedSize(QSize(640, 480))  # Set fixed size for video label
@@ -39,31 +41,42 @@ class DoorDetectionTab(QWidget):
         self.motion_label = QLabel("Motion: Not Detected")
         self.motion_label.setStyleSheet("font-size: 14px;")
         layout.addWidget(self.motion_label)
+        self.motion_shown = None
 
-    def update_frame(self):
-        frame, detections = self.video_processor.process_frame(self.stream_name)
-        if frame is not None:
-            h, w, ch = frame.shape
-            bytes_per_line = ch * w
-            qt_image = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(qt_image)
-            self.video_label.setPixmap(pixmap.scaled(self.video_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        if video_processor.timeseries is not None:
+            self.activity_chart = TrendChart(video_processor.timeseries, stream_name, 'door_detection.moving',
+                                             "Share of time the door is moving, per minute, last hour",
+                                             window_seconds=3600, step=60, color="#EBCB8B")
+            layout.addWidget(self.activity_chart)
 
-        door_result = self.video_processor.results[self.stream_name]
-        status = door_result['status']
-        movement = door_result['movement']
+        self.video_processor.subscribe(stream_name, self.update_frame)
+        self.result_events = ResultEvents(video_processor, stream_name)
+        self.result_events.changed.connect(self.update_results)
 
-        if door_result['detected']:
-            color = "#A3BE8C"  # Green if detected
-            icon = "🚪"
-        else:
-            color = "#BF616A"  # Red if not detected
-            icon = "❓"
+    def update_frame(self, seq, frame, detections):
+        self.video_label.show_frame(frame)
+
+    def update_results(self, changes):
+        if 'detected' in changes:
+            if changes['detected']:
+                color = "#A3BE8C"  # Green if detected
+                icon = "🚪"
+            else:
+                color = "#BF616A"  # Red if not detected
+                icon = "❓"
+            self.status_icon.setText(icon)
+            self.status_label.setStyleSheet(f"font-size: 18px; font-weight: bold; color: {color};")
+
+        if 'status' in changes:
+            self.status_label.setText(f"Door Status: {changes['status']}")
+
+        if 'movement' in changes:
+            self.update_movement(changes['movement'])
 
-        self.status_icon.setText(icon)
-        self.status_label.setText(f"Door Status: {status}")
-        self.status_label.setStyleSheet(f"font-size: 18px; font-weight: bold; color: {color};")
+        if 'detections' in changes:
+            self.update_motion(changes['detections'])
 
+    def update_movement(self, movement):
         if movement:
             self.movement_label.setText(f"Movement: {movement}")
             self.movement_label.setStyleSheet("font-size: 14px; color: #88C0D0;")  # Blue for movement
@@ -71,8 +84,12 @@ class DoorDetectionTab(QWidget):
             self.movement_label.setText("Movement: Unknown")
             self.movement_label.setStyleSheet("font-size: 14px; color: #D8DEE9;")  # Default color
 
-        # Update motion detection label
-        if "Motion Detected" in [d.split(":")[0] for d in detections]:
+    def update_motion(self, detections):
+        motion = "Motion Detected" in [d.split(":")[0] for d in detections]
+        if motion == self.motion_shown:
+            return
+        self.motion_shown = motion
+        if motion:
             self.motion_label.setText("Motion: Detected")
             self.motion_label.setStyleSheet("font-size: 14px; color: #EBCB8B;")  # Yellow for motion
         else:
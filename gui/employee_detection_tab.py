@@ -1,6 +1,7 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QHBoxLayout
-from PyQt5.QtGui import QImage, QPixmap
 from PyQt5.QtCore import Qt, QTimer
+from gui.video_label import VideoLabel
+from gui.result_events import ResultEvents
 
 class EmployeeDetectionTab(QWidget):
     def __init__(self, video_processor, stream_name):
@@ -12,7 +13,7 @@ class EmployeeDetectionTab(QWidget):
         self.setLayout(layout)
 
         # Video feed
-        self.video_label = QLabel()
+        self.video_label = VideoLabel()
         self.video_label.setAlignment(Qt.AlignCenter)
         self.video_label.setStyleSheet("border: 2px solid #4C566A; background-color: #2E3440;")
         layout.addWidget(self.video_label)
@@ -35,20 +36,22 @@ class EmployeeDetectionTab(QWidget):
         layout.addWidget(self.timer_label)
 
         self.minutes_passed = 0
+        self.timer_overdue = None
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_timer)
         self.timer.start(60000)  # Update every minute
 
-    def update_frame(self):
-        frame, detections = self.video_processor.process_frame(self.stream_name)
-        if frame is not None:
-            h, w, ch = frame.shape
-            bytes_per_line = ch * w
-            qt_image = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(qt_image)
-            self.video_label.setPixmap(pixmap.scaled(self.video_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        self.video_processor.subscribe(stream_name, self.update_frame)
+        self.result_events = ResultEvents(video_processor, stream_name)
+        self.result_events.changed.connect(self.update_results)
 
-        is_present = self.video_processor.results[self.stream_name]
+    def update_frame(self, seq, frame, detections):
+        self.video_label.show_frame(frame)
+
+    def update_results(self, changes):
+        if 'value' not in changes:
+            return
+        is_present = changes['value']
         status = "Present" if is_present else "Absent"
         color = "#A3BE8C" if is_present else "#BF616A"  # Green if present, red if absent
         icon = "👤" if is_present else "❓"
@@ -58,12 +61,22 @@ class EmployeeDetectionTab(QWidget):
 
         if is_present:
             self.minutes_passed = 0
-        self.update_timer()
+            self.show_timer()
 
     def update_timer(self):
-        self.minutes_passed += 1
-        self.timer_label.setText(f"Time since last detection: {self.minutes_passed} minutes")
-        if self.minutes_passed >= 10:
-            self.timer_label.setStyleSheet("font-size: 14px; color: #BF616A;")
+        # Results only arrive on change, so an employee who stays present is checked here
+        if self.result_events.fields.get('value'):
+            self.minutes_passed = 0
         else:
-            self.timer_label.setStyleSheet("font-size: 14px; color: #D8DEE9;")
\ No newline at end of file
+            self.minutes_passed += 1
+        self.show_timer()
+
+    def show_timer(self):
+        self.timer_label.setText(f"Time since last detection: {self.minutes_passed} minutes")
+        overdue = self.minutes_passed >= 10
+        if overdue != self.timer_overdue:
+            self.timer_overdue = overdue
+            if overdue:
+                self.timer_label.setStyleSheet("font-size: 14px; color: #BF616A;")
+            else:
+                self.timer_label.setStyleSheet("font-size: 14px; color: #D8DEE9;")
\ No newline at end of file
@@ -1,6 +1,7 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QListWidget, QListWidgetItem
-from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QListWidget, QListWidgetItem, QLineEdit, QPushButton
 from PyQt5.QtCore import Qt
+from gui.video_label import VideoLabel
+from gui.result_events import ResultEvents
 
 class FaceRecognitionTab(QWidget):
     def __init__(self, video_processor, stream_name):
@@ -12,7 +13,7 @@ class FaceRecognitionTab(QWidget):
         self.setLayout(layout)
 
         # Video feed
-        self.video_label = QLabel()
+        self.video_label = VideoLabel()
         self.video_label.setAlignment(Qt.AlignCenter)
         self.video_label.setStyleSheet("border: 2px solid #4C566A; background-color: #2E3440;")
         layout.addWidget(self.video_label)
@@ -25,18 +26,46 @@ class FaceRecognitionTab(QWidget):
         self.employee_list = QListWidget()
         self.employee_list.setStyleSheet("background-color: #3B4252; color: #ECEFF4;")
         layout.addWidget(self.employee_list)
+        self.shown_employees = []
 
-    def update_frame(self):
-        frame, detections = self.video_processor.process_frame(self.stream_name)
-        if frame is not None:
-            h, w, ch = frame.shape
-            bytes_per_line = ch * w
-            qt_image = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(qt_image)
-            self.video_label.setPixmap(pixmap.scaled(self.video_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
-
-        employees = self.video_processor.results[self.stream_name]
-        self.employee_list.clear()
-        for employee in employees:
+        # Enrollment: the largest face currently in view is added under the typed name
+        enroll_layout = QHBoxLayout()
+        self.enroll_name = QLineEdit()
+        self.enroll_name.setPlaceholderText("Employee name")
+        self.enroll_button = QPushButton("Enroll Face")
+        self.enroll_button.clicked.connect(self.enroll_face)
+        self.enroll_status = QLabel()
+        enroll_layout.addWidget(self.enroll_name)
+        enroll_layout.addWidget(self.enroll_button)
+        enroll_layout.addWidget(self.enroll_status)
+        layout.addLayout(enroll_layout)
+
+        self.video_processor.subscribe(stream_name, self.update_frame)
+        self.result_events = ResultEvents(video_processor, stream_name)
+        self.result_events.changed.connect(self.update_results)
+
+    def update_frame(self, seq, frame, detections):
+        self.video_label.show_frame(frame)
+
+    def update_results(self, changes):
+        if 'value' not in changes:
+            return
+        employees = changes['value']
+        # The result is a rolling window: drop rows that aged out, then append the new ones
+        while self.shown_employees != employees[:len(self.shown_employees)]:
+            self.shown_employees.pop(0)
+            self.employee_list.takeItem(0)
+        for employee in employees[len(self.shown_employees):]:
             item = QListWidgetItem(f"{employee['name']} - {employee['time']}")
-            self.employee_list.addItem(item)
\ No newline at end of file
+            self.employee_list.addItem(item)
+            self.shown_employees.append(employee)
+
+    def enroll_face(self):
+        name = self.enroll_name.text().strip()
+        if not name:
+            return
+        if self.video_processor.enroll_face(self.stream_name, name):
+            self.enroll_status.setText(f"Enrolled {name}")
+            self.enroll_name.clear()
+        else:
+            self.enroll_status.setText("No face in view")
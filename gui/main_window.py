@@ -12,7 +12,8 @@ from gui.alerts_tab import AlertsTab
 from utils.video_processor import VideoProcessor
 
 class CCTVMonitoringSystem(QMainWindow):
-    def __init__(self):
+    def __init__(self, inference_workers=0, metrics_port=None, capture_backend='opencv', capture_fps=None,
+                 record_clips=None, event_store='events.db', timeseries='timeseries.npz'):
         super().__init__()
         self.setWindowTitle("CCTV Monitoring System")
         self.setGeometry(100, 100, 1200, 800)
@@ -26,6 +27,15 @@ class CCTVMonitoringSystem(QMainWindow):
         self.layout.addWidget(self.tab_widget)
 
         self.video_processor = VideoProcessor()
+        self.video_processor.set_capture_backend(capture_backend, capture_fps)
+        if inference_workers:
+            self.video_processor.set_inference_engine('process', inference_workers)
+        if metrics_port:
+            self.video_processor.enable_metrics(metrics_port)
+        if record_clips:
+            self.video_processor.enable_recording(record_clips)
+        self.video_processor.enable_event_store(event_store)
+        self.video_processor.enable_timeseries(timeseries)
 
         self.video_tab = VideoTab(self.video_processor)
         self.cash_drawer_tab = CashDrawerTab(self.video_processor, 'cash_drawer')
@@ -33,8 +43,8 @@ class CCTVMonitoringSystem(QMainWindow):
         self.door_detection_tab = DoorDetectionTab(self.video_processor, 'door_detection')
         self.people_counting_tab = PeopleCountingTab(self.video_processor, 'people_counting')
         self.face_recognition_tab = FaceRecognitionTab(self.video_processor, 'face_recognition')
-        self.settings_tab = SettingsTab(self.update_camera)
-        self.alerts_tab = AlertsTab()
+        self.settings_tab = SettingsTab(self.update_camera, self.update_rois)
+        self.alerts_tab = AlertsTab(self.video_processor.event_store)
 
         self.tab_widget.addTab(self.video_tab, QIcon("icons/video.png"), "Video Streams")
         self.tab_widget.addTab(self.cash_drawer_tab, QIcon("icons/cash.png"), "Cash Drawer")
@@ -50,6 +60,7 @@ class CCTVMonitoringSystem(QMainWindow):
         self.timer.start(30)  # Update every 30 ms
 
         self.alerts_tab.add_alert("System started")
+        self.connection_states = {}
 
         # Add dark mode toggle button
         self.dark_mode_button = QPushButton("Toggle Dark Mode")
@@ -57,16 +68,41 @@ class CCTVMonitoringSystem(QMainWindow):
         self.layout.addWidget(self.dark_mode_button)
 
     def update_all_tabs(self):
-        for tab in [self.video_tab, self.cash_drawer_tab, self.employee_detection_tab, self.door_detection_tab, 
-                    self.people_counting_tab, self.face_recognition_tab]:
-            tab.update_frame()
+        # Each new frame is analyzed once and handed to every tab subscribed to its stream
+        self.video_processor.poll()
+        self.check_connections()
+        recorder = self.video_processor.recorder
+        while recorder is not None and recorder.saved_clips:
+            stream_name, path, events = recorder.saved_clips.popleft()
+            self.alerts_tab.add_alert(f"Saved clip ({', '.join(events)}): {path}", stream_name, 'clip')
+
+    def check_connections(self):
+        # Cameras connect and reconnect in the background; surface state changes as alerts
+        for stream_name in self.video_processor.streams:
+            state = self.video_processor.get_connection_status(stream_name)['state']
+            previous = self.connection_states.get(stream_name, 'no_camera')
+            if state != previous:
+                self.connection_states[stream_name] = state
+                if state in ('connected', 'stalled') or previous in ('connected', 'stalled'):
+                    self.alerts_tab.add_alert(f"Camera for {stream_name} is {state}", stream_name, 'connection')
 
     def update_camera(self, stream_name, camera_url):
         success = self.video_processor.set_camera(stream_name, camera_url)
         if success:
-            self.alerts_tab.add_alert(f"Camera for {stream_name} updated to {camera_url}")
+            self.alerts_tab.add_alert(f"Camera for {stream_name} updated to {camera_url}", stream_name)
+        else:
+            self.alerts_tab.add_alert(f"Failed to update camera for {stream_name} to {camera_url}", stream_name)
+
+    def update_rois(self, stream_name, text):
+        try:
+            rois = self.video_processor.set_rois(stream_name, text)
+        except ValueError as e:
+            self.alerts_tab.add_alert(f"Invalid ROIs for {stream_name}: {str(e)}", stream_name)
+            return
+        if rois:
+            self.alerts_tab.add_alert(f"Detection for {stream_name} limited to {len(rois)} ROI(s)", stream_name)
         else:
-            self.alerts_tab.add_alert(f"Failed to update camera for {stream_name} to {camera_url}")
+            self.alerts_tab.add_alert(f"Detection for {stream_name} uses the whole frame", stream_name)
 
     def closeEvent(self, event):
         self.video_processor.release()
@@ -1,6 +1,8 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QHBoxLayout, QProgressBar
-from PyQt5.QtGui import QImage, QPixmap
 from PyQt5.QtCore import Qt
+from gui.video_label import VideoLabel
+from gui.result_events import ResultEvents
+from gui.trend_chart import TrendChart
 
 class PeopleCountingTab(QWidget):
     def __init__(self, video_processor, stream_name):
@@ -12,7 +14,7 @@ class PeopleCountingTab(QWidget):
         self.setLayout(layout)
 
         # Video feed
-        self.video_label = QLabel()
+        self.video_label = VideoLabel()
         self.video_label.setAlignment(Qt.AlignCenter)
         self.video_label.setStyleSheet("border: 2px solid #4C566A; background-color: #2E3440;")
         self.video_label.setFixedSize(640, 480)  # Set fixed size for the video label
@@ -41,22 +43,40 @@ class PeopleCountingTab(QWidget):
         female_layout.addWidget(self.female_progress)
         layout.addLayout(female_layout)
 
-    def update_frame(self):
-        frame, detections = self.video_processor.process_frame(self.stream_name)
-        if frame is not None:
-            h, w, ch = frame.shape
-            bytes_per_line = ch * w
-            qt_image = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(qt_image)
-            scaled_pixmap = pixmap.scaled(640, 480, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            self.video_label.setPixmap(scaled_pixmap)
+        # Counts over tracked people, stable while they stay in view
+        self.visitors_label = QLabel("Unique Visitors: 0")
+        self.crossings_label = QLabel("Entered: 0  Exited: 0")
+        layout.addWidget(self.visitors_label)
+        layout.addWidget(self.crossings_label)
 
-        counts = self.video_processor.results[self.stream_name]
-        total = counts['male'] + counts['female']
+        if video_processor.timeseries is not None:
+            self.occupancy_chart = TrendChart(video_processor.timeseries, stream_name, 'people_counting.total',
+                                              "People in view, last 10 minutes", window_seconds=600)
+            layout.addWidget(self.occupancy_chart)
+
+        self.video_processor.subscribe(stream_name, self.update_frame)
+        self.result_events = ResultEvents(video_processor, stream_name)
+        self.result_events.changed.connect(self.update_results)
+
+    def update_frame(self, seq, frame, detections):
+        self.video_label.show_frame(frame)
+
+    def update_results(self, changes):
+        counts = self.result_events.fields
+        if 'visitors' in changes:
+            self.visitors_label.setText(f"Unique Visitors: {counts['visitors']}")
+        if 'entered' in changes or 'exited' in changes:
+            self.crossings_label.setText(f"Entered: {counts['entered']}  Exited: {counts['exited']}")
+        if 'male' not in changes and 'female' not in changes and 'total' not in changes:
+            return
+        # total includes people whose gender is not known yet
+        total = counts['total']
         self.total_label.setText(f"Total People: {total}")
-        self.male_label.setText(f"Male: {counts['male']}")
-        self.female_label.setText(f"Female: {counts['female']}")
-        
+        if 'male' in changes:
+            self.male_label.setText(f"Male: {counts['male']}")
+        if 'female' in changes:
+            self.female_label.setText(f"Female: {counts['female']}")
+
         if total > 0:
             male_percentage = (counts['male'] / total) * 100
             female_percentage = (counts['female'] / total) * 100
@@ -0,0 +1,25 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+class ResultEvents(QObject):
+    # Emits changed(fields) with only the result fields that differ from the last analyzed frame.
+    # Dict results are split by key; other results (flags, lists) are reported under 'value'.
+    # Tabs connect their label and style updates to it, so widgets are only touched when a field changes.
+    changed = pyqtSignal(dict)
+
+    def __init__(self, video_processor, stream_name):
+        super().__init__()
+        self.video_processor = video_processor
+        self.stream_name = stream_name
+        self.fields = {}
+        video_processor.subscribe(stream_name, self.on_frame)
+
+    def on_frame(self, seq, frame, detections):
+        result = self.video_processor.results[self.stream_name]
+        fields = dict(result) if isinstance(result, dict) else {'value': result}
+        fields['detections'] = detections
+
+        changes = {key: value for key, value in fields.items()
+                   if key not in self.fields or self.fields[key] != value}
+        if changes:
+            self.fields.update(changes)
+            self.changed.emit(changes)
@@ -1,9 +1,10 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QFormLayout
 
 class SettingsTab(QWidget):
-    def __init__(self, update_camera_callback):
+    def __init__(self, update_camera_callback, update_rois_callback=None):
         super().__init__()
         self.update_camera_callback = update_camera_callback
+        self.update_rois_callback = update_rois_callback
         
         layout = QVBoxLayout()
         self.setLayout(layout)
@@ -13,6 +14,7 @@ class SettingsTab(QWidget):
         streams = ['cash_drawer', 'employee_detection', 'door_detection', 'people_counting', 'face_recognition']
         
         self.input_fields = {}
+        self.roi_fields = {}
         for stream in streams:
             label = QLabel(f"{stream.replace('_', ' ').title()} Camera URL:")
             input_field = QLineEdit()
@@ -22,6 +24,17 @@ class SettingsTab(QWidget):
             
             form_layout.addRow(label, input_field)
             form_layout.addRow(update_button)
+
+            if self.update_rois_callback is not None:
+                # Fractions of the frame: x1,y1,x2,y2 for a rectangle, or x,y pairs for a polygon
+                roi_field = QLineEdit()
+                roi_field.setPlaceholderText("Whole frame, or e.g. 0.1,0.2,0.6,0.9; 0.5,0.1,0.9,0.1,0.7,0.5")
+                roi_button = QPushButton(f"Set {stream.replace('_', ' ').title()} ROIs")
+                roi_button.clicked.connect(lambda checked, s=stream: self.update_rois(s))
+                form_layout.addRow(QLabel("Detection ROIs:"), roi_field)
+                form_layout.addRow(roi_button)
+                self.roi_fields[stream] = roi_field
+
             form_layout.addRow(QLabel())  # Empty label for spacing
             
             self.input_fields[stream] = input_field
@@ -30,4 +43,7 @@ class SettingsTab(QWidget):
 
     def update_camera(self, stream_name):
         camera_url = self.input_fields[stream_name].text()
-        self.update_camera_callback(stream_name, camera_url)
\ No newline at end of file
+        self.update_camera_callback(stream_name, camera_url)
+
+    def update_rois(self, stream_name):
+        self.update_rois_callback(stream_name, self.roi_fields[stream_name].text())
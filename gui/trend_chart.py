@@ -0,0 +1,76 @@
+import time
+import numpy as np
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QPointF, QTimer
+from PyQt5.QtGui import QColor, QPainter, QPen, QPolygonF
+
+class TrendChart(QWidget):
+    # Mean line over a min-max band for one metric of the time-series store. Queries a few rollup
+    # buckets every couple of seconds while visible; never touches raw history.
+    def __init__(self, timeseries, camera, metric, title, window_seconds=600, step=None, color="#88C0D0"):
+        super().__init__()
+        self.timeseries = timeseries
+        self.camera = camera
+        self.metric = metric
+        self.title = title
+        self.window_seconds = window_seconds
+        self.step = step
+        self.color = QColor(color)
+        self.series = None
+        self.setMinimumHeight(90)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(2000)
+
+    def refresh(self):
+        if not self.isVisible():
+            return
+        end = time.time()
+        self.series = (end, self.timeseries.query(self.camera, self.metric, end - self.window_seconds, end, self.step))
+        self.update()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = self.contentsRect().adjusted(4, 18, -4, -4)
+        painter.setPen(QColor("#4C566A"))
+        painter.drawRect(rect)
+
+        label = self.title
+        if self.series is not None and len(self.series[1]['time']):
+            end, series = self.series
+            top = max(1.0, float(series['max'].max()))
+            label += f" (now {series['mean'][-1]:.2f}, peak {top:.0f})"
+            # Steps: each bucket spans its own width, so a single minute bucket is still visible.
+            # Runs of consecutive buckets are drawn separately, leaving gaps where nothing was recorded.
+            times = series['time']
+            bucket = self.step or (float(np.diff(times).min()) if len(times) > 1 else 1.0)
+            band_color = QColor(self.color)
+            band_color.setAlpha(60)
+            breaks = np.nonzero(np.diff(times) > bucket * 1.5)[0] + 1
+            for run in np.split(np.arange(len(times)), breaks):
+                edges = np.stack([times[run], times[run] + bucket], axis=1).ravel()
+                xs = rect.left() + np.clip((edges - (end - self.window_seconds)) / self.window_seconds, 0, 1) \
+                    * rect.width()
+
+                def ys_of(values):
+                    return rect.bottom() - np.clip(np.repeat(values[run], 2) / top, 0, 1) * rect.height()
+
+                band = QPolygonF([QPointF(x, y) for x, y in zip(xs, ys_of(series['max']))] +
+                                 [QPointF(x, y) for x, y in zip(xs[::-1], ys_of(series['min'])[::-1])])
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(band_color)
+                painter.drawPolygon(band)
+
+                painter.setPen(QPen(self.color, 2))
+                painter.setBrush(Qt.NoBrush)
+                painter.drawPolyline(QPolygonF([QPointF(x, y) for x, y in zip(xs, ys_of(series['mean']))]))
+
+        painter.setPen(QColor("#D8DEE9"))
+        painter.drawText(self.contentsRect().adjusted(4, 0, -4, 0), Qt.AlignLeft | Qt.AlignTop, label)
+        painter.end()
@@ -0,0 +1,67 @@
+import cv2
+import numpy as np
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtGui import QImage, QPainter
+
+class VideoLabel(QLabel):
+    # Shows RGB frames scaled to fit. Frames are resized once in OpenCV into a reused buffer and
+    # painted directly, and nothing is drawn while the label is hidden or scrolled out of view.
+    def __init__(self):
+        super().__init__()
+        self.frame = None
+        self.dirty = False
+        self.buffer = None
+        self.image = None
+
+    def show_frame(self, frame):
+        self.frame = frame
+        self.dirty = True
+        if self.isVisible() and not self.visibleRegion().isEmpty():
+            self.render_frame()
+
+    def render_frame(self):
+        self.dirty = False
+        if self.frame is None:
+            return
+        if self.text():
+            self.setText("")
+
+        rect = self.contentsRect()
+        h, w = self.frame.shape[:2]
+        scale = min(rect.width() / w, rect.height() / h)
+        target_w, target_h = max(1, int(w * scale)), max(1, int(h * scale))
+        if self.buffer is None or self.buffer.shape[:2] != (target_h, target_w):
+            self.buffer = np.empty((target_h, target_w, 3), dtype=np.uint8)
+
+        if (target_w, target_h) == (w, h):
+            np.copyto(self.buffer, self.frame)
+        else:
+            interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+            cv2.resize(self.frame, (target_w, target_h), dst=self.buffer, interpolation=interpolation)
+        # Wraps the buffer without copying it; only the QImage header is new each frame
+        self.image = QImage(self.buffer.data, target_w, target_h, 3 * target_w, QImage.Format_RGB888)
+        self.update()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.image is None:
+            return
+        rect = self.contentsRect()
+        x = rect.x() + (rect.width() - self.image.width()) // 2
+        y = rect.y() + (rect.height() - self.image.height()) // 2
+        painter = QPainter(self)
+        painter.drawImage(x, y, self.image)
+        painter.end()
+
+    def showEvent(self, event):
+        # Catch up with the newest frame that arrived while the tab was hidden
+        super().showEvent(event)
+        if self.dirty:
+            self.render_frame()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.frame is not None:
+            self.dirty = True
+            if self.isVisible():
+                self.render_frame()
@@ -1,32 +1,45 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QGridLayout
-from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QGridLayout, QScrollArea
 from PyQt5.QtCore import Qt
+from gui.video_label import VideoLabel
 
 class VideoTab(QWidget):
     def __init__(self, video_processor):
         super().__init__()
         self.video_processor = video_processor
-        layout = QGridLayout()
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
         self.setLayout(layout)
 
+        # Large camera walls scroll; tiles outside the viewport are not redrawn
+        self.scroll_area = QScrollArea()
+        self.scroll_area.setWidgetResizable(True)
+        layout.addWidget(self.scroll_area)
+        grid_widget = QWidget()
+        grid = QGridLayout(grid_widget)
+        self.scroll_area.setWidget(grid_widget)
+
         self.video_labels = {}
-        streams = ['cash_drawer', 'employee_detection', 'door_detection', 'people_counting', 'face_recognition']
-        
-        for i, stream in enumerate(streams):
-            label = QLabel()
+        for i, stream in enumerate(self.video_processor.streams):
+            label = VideoLabel()
             label.setAlignment(Qt.AlignCenter)
             label.setStyleSheet("border: 2px solid #4C566A; background-color: #2E3440;")
-            layout.addWidget(label, i // 3, i % 3)
+            label.setText(f"No feed for {stream}")
+            label.setMinimumSize(320, 240)
+            grid.addWidget(label, i // 3, i % 3)
             self.video_labels[stream] = label
 
-    def update_frame(self):
-        for stream, label in self.video_labels.items():
-            frame, _ = self.video_processor.process_frame(stream)
-            if frame is not None:
-                h, w, ch = frame.shape
-                bytes_per_line = ch * w
-                qt_image = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-                pixmap = QPixmap.fromImage(qt_image)
-                label.setPixmap(pixmap.scaled(label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
-            else:
-                label.setText(f"No feed for {stream}")
\ No newline at end of file
+            # Frames arrive from the shared analysis, not from a second read per tick
+            self.video_processor.subscribe(
+                stream, lambda seq, frame, detections, s=stream: self.update_frame(s, frame))
+
+        # Tiles scrolled into view catch up with the newest frame
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self.render_pending)
+        self.scroll_area.horizontalScrollBar().valueChanged.connect(self.render_pending)
+
+    def update_frame(self, stream, frame):
+        self.video_labels[stream].show_frame(frame)
+
+    def render_pending(self):
+        for label in self.video_labels.values():
+            if label.dirty and not label.visibleRegion().isEmpty():
+                label.render_frame()
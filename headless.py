@@ -0,0 +1,151 @@
+import json
+import signal
+import sys
+import time
+from datetime import datetime
+import numpy as np
+from utils.video_processor import VideoProcessor
+from utils.analyzers import ANALYZERS
+
+def load_config(path):
+    with open(path) as f:
+        if path.lower().endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit("Please install PyYAML to read YAML configs: pip install pyyaml")
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+def _json_default(value):
+    # Results hold numpy scalars (e.g. np.bool_ from the random stubs)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class JsonLinesWriter:
+    def __init__(self, output):
+        self.file = sys.stdout if output in (None, '-') else open(output, 'a')
+
+    def write(self, record):
+        record['time'] = datetime.now().isoformat(timespec='milliseconds')
+        self.file.write(json.dumps(record, default=_json_default) + "\n")
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        if self.file is not sys.stdout:
+            self.file.close()
+
+def run_headless(config_path, output='-', inference_workers=0, changes_only=False, duration=None, metrics_port=None,
+                 startup_report=None, capture_backend='opencv', capture_fps=None, record_clips=None, event_store=None,
+                 timeseries=None):
+    config = load_config(config_path)
+    writer = JsonLinesWriter(output)
+    # Library print() calls must not interleave with JSON lines on stdout
+    sys.stdout = sys.stderr
+
+    video_processor = VideoProcessor()
+    if startup_report is not None:
+        video_processor.model_loader.on_loaded = startup_report.add_model
+    video_processor.set_capture_backend(config.get('capture_backend', capture_backend),
+                                        config.get('capture_fps', capture_fps))
+
+    # Entries are either `name: source` or `name: {source: ..., analyzers: [...], rois: [...]}`
+    cameras = {}
+    for stream_name, entry in config.get('cameras', {}).items():
+        if isinstance(entry, dict):
+            source, analyzers, rois = entry.get('source'), entry.get('analyzers'), entry.get('rois')
+        else:
+            source, analyzers, rois = entry, None, None
+        unknown = [name for name in analyzers or [stream_name] if name not in ANALYZERS]
+        if unknown:
+            writer.write({'type': 'alert', 'stream': stream_name, 'message': f"Unknown analyzer {', '.join(unknown)}"})
+            continue
+        if analyzers or stream_name not in video_processor.streams:
+            video_processor.add_stream(stream_name, analyzers)
+        cameras[stream_name] = source
+        if rois:
+            try:
+                video_processor.set_rois(stream_name, rois)
+            except ValueError as e:
+                writer.write({'type': 'alert', 'stream': stream_name, 'message': f"Invalid ROIs: {str(e)}"})
+
+    # Worker processes are set up for the streams registered above
+    workers = config.get('inference_workers', inference_workers)
+    if workers:
+        video_processor.set_inference_engine('process', workers)
+    metrics_port = config.get('metrics_port', metrics_port)
+    if metrics_port:
+        video_processor.enable_metrics(metrics_port)
+    # record_clips is a directory, or a dict of enable_recording arguments
+    record_clips = config.get('record_clips', record_clips)
+    event_store = config.get('event_store', event_store)
+    if event_store:
+        video_processor.enable_event_store(event_store)
+    timeseries = config.get('timeseries', timeseries)
+    if timeseries:
+        video_processor.enable_timeseries(timeseries)
+    recorder = None
+    if record_clips:
+        settings = record_clips if isinstance(record_clips, dict) else {'output_dir': record_clips}
+        recorder = video_processor.enable_recording(**settings)
+
+    for stream_name, source in cameras.items():
+        success = video_processor.set_camera(stream_name, str(source))
+        message = f"Camera for {stream_name} updated to {source}" if success else f"Failed to update camera for {stream_name} to {source}"
+        writer.write({'type': 'alert', 'stream': stream_name, 'message': message})
+
+    last_detections = {}
+
+    def on_frame(stream_name, seq, frame, detections):
+        changed = last_detections.get(stream_name) != detections
+        if changed:
+            last_detections[stream_name] = detections
+            writer.write({'type': 'alert', 'stream': stream_name, 'seq': seq, 'message': "; ".join(detections)})
+        if changed or not changes_only:
+            record = {'type': 'result', 'stream': stream_name, 'seq': seq,
+                      'results': video_processor.results[stream_name], 'detections': detections}
+            if len(video_processor.stream_analyzers[stream_name]) > 1:
+                record['analyzers'] = video_processor.stream_results[stream_name]
+            writer.write(record)
+
+    for stream_name in cameras:
+        video_processor.subscribe(
+            stream_name, lambda seq, frame, detections, s=stream_name: on_frame(s, seq, frame, detections))
+
+    connection_states = {}
+
+    def report_connections():
+        for stream_name in cameras:
+            status = video_processor.get_connection_status(stream_name)
+            if connection_states.get(stream_name) != status['state']:
+                connection_states[stream_name] = status['state']
+                writer.write({'type': 'connection', 'stream': stream_name, **status})
+
+    running = [True]
+    signal.signal(signal.SIGTERM, lambda signum, stack: running.__setitem__(0, False))
+    started = time.monotonic()
+    try:
+        # No GUI timer: analyze as fast as frames arrive, and only nap when every stream is idle
+        while running[0]:
+            if not video_processor.poll():
+                time.sleep(0.002)
+            report_connections()
+            while recorder is not None and recorder.saved_clips:
+                stream_name, path, events = recorder.saved_clips.popleft()
+                writer.write({'type': 'clip', 'stream': stream_name, 'path': path, 'events': events})
+            writer.flush()
+            if duration is not None and time.monotonic() - started >= duration:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        video_processor.release()
+        writer.close()
+        sys.stdout = sys.__stdout__
+    return 0
@@ -1,9 +1,73 @@
 import sys
-from PyQt5.QtWidgets import QApplication
-from gui.main_window import CCTVMonitoringSystem
+import argparse
+from utils.startup_report import StartupReport
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = CCTVMonitoringSystem()
-    window.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="CCTV Monitoring System")
+    parser.add_argument('--inference-workers', type=int, default=0,
+                        help="Run analytics in this many worker processes (0 runs them in the main process)")
+    parser.add_argument('--metrics-port', type=int,
+                        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument('--capture-backend', choices=['opencv', 'ffmpeg'], default='opencv',
+                        help="Decode with OpenCV, or with an ffmpeg pipe that scales to analysis size in the decoder")
+    parser.add_argument('--capture-fps', type=float,
+                        help="With --capture-backend ffmpeg, decimate every camera to this frame rate")
+    parser.add_argument('--record-clips', metavar='DIR',
+                        help="Save a clip around each detected event (drawer opened, door moving, ...) to DIR")
+    parser.add_argument('--event-store', metavar='PATH',
+                        help="SQLite file for alert and event history (GUI default: events.db)")
+    parser.add_argument('--timeseries', metavar='PATH',
+                        help="Snapshot file for per-camera metric history (GUI default: timeseries.npz)")
+    parser.add_argument('--headless', action='store_true',
+                        help="Process cameras without a window and emit JSON lines")
+    parser.add_argument('--config', help="Camera config (YAML or JSON), required with --headless")
+    parser.add_argument('--output', default='-',
+                        help="JSON lines destination for --headless, or CSV/.parquet file for --analyze ('-' is stdout)")
+    parser.add_argument('--changes-only', action='store_true',
+                        help="With --headless, only emit results when a stream's detections change")
+    parser.add_argument('--duration', type=float, help="With --headless, stop after this many seconds")
+    parser.add_argument('--analyze', nargs='+', metavar='VIDEO',
+                        help="Analyze recorded video files offline, as fast as the cores allow, and exit")
+    parser.add_argument('--analyzers', nargs='+',
+                        help="With --analyze, the analyzers to run (default: door_detection people_counting cash_drawer)")
+    parser.add_argument('--jobs', type=int, help="With --analyze, worker processes (default: one per core)")
+    parser.add_argument('--chunk-seconds', type=float, default=60.0,
+                        help="With --analyze, length of the video chunks analyzed in parallel")
+    parser.add_argument('--summary', metavar='PATH',
+                        help="With --analyze, event summary JSON (default: next to --output)")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="Print where import and model load time goes to stderr")
+    args, qt_args = parser.parse_known_args()
+    report = StartupReport(enabled=args.startup_report)
+
+    if args.analyze:
+        from offline import run_offline
+        sys.exit(run_offline(args.analyze, args.output, args.analyzers, args.jobs, args.chunk_seconds, args.summary))
+
+    if args.headless:
+        if not args.config:
+            parser.error("--headless requires --config")
+        # Imported here so the headless path never loads Qt
+        with report.phase("import headless"):
+            from headless import run_headless
+        sys.exit(run_headless(args.config, args.output, args.inference_workers, args.changes_only, args.duration,
+                              args.metrics_port, report, args.capture_backend, args.capture_fps, args.record_clips,
+                              args.event_store, args.timeseries))
+
+    with report.phase("import PyQt5"):
+        from PyQt5.QtWidgets import QApplication
+    with report.phase("import gui"):
+        from gui.main_window import CCTVMonitoringSystem
+
+    with report.phase("create QApplication"):
+        app = QApplication(sys.argv[:1] + qt_args)
+    with report.phase("build window"):
+        window = CCTVMonitoringSystem(inference_workers=args.inference_workers, metrics_port=args.metrics_port,
+                                      capture_backend=args.capture_backend, capture_fps=args.capture_fps,
+                                      record_clips=args.record_clips, event_store=args.event_store or 'events.db',
+                                      timeseries=args.timeseries or 'timeseries.npz')
+        window.video_processor.model_loader.on_loaded = report.add_model
+    with report.phase("show window"):
+        window.show()
+    report.print()
+    sys.exit(app.exec_())
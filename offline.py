@@ -0,0 +1,248 @@
+import csv
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from collections import Counter
+import cv2
+import numpy as np
+
+OFFLINE_STREAM = 'offline'
+DEFAULT_ANALYZERS = ['door_detection', 'people_counting', 'cash_drawer']
+
+# Set up once per worker process by _init_worker
+_worker = {}
+
+def _init_worker(analyzers):
+    # Workers print to the parent's stdout, which may be carrying the CSV
+    sys.stdout = sys.stderr
+    # Every core already runs its own chunk; OpenCV's own threads would only oversubscribe them
+    cv2.setNumThreads(1)
+    from utils.video_processor import VideoProcessor
+
+    processor = VideoProcessor()
+    processor.add_stream(OFFLINE_STREAM, analyzers)
+    processor.request_models(OFFLINE_STREAM, wait=True)
+    if not processor.models_ready(OFFLINE_STREAM):
+        # Never raise here: Pool restarts workers whose initializer fails, forever. Every chunk
+        # reports the error instead and run_offline stops the pool.
+        _worker['error'] = f"Models failed to load: {processor.model_loader.errors}"
+        return
+    events = []
+    processor.event_listeners.append(
+        lambda stream_name, analyzer_name, event: events.append((_worker['frame'], analyzer_name, event)))
+    _worker.update(processor=processor, events=events, frame=0)
+
+def _value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=_value)
+    return value
+
+def _analyze_chunk(task):
+    # Analyzes frames [start, end) of one video. State is warmed up on the warmup_frames before start,
+    # so trackers and motion baselines do not restart cold at every chunk boundary.
+    video_index, path, chunk, start, end, fps, warmup_frames = task
+    if 'error' in _worker:
+        return video_index, None, _worker['error']
+    processor = _worker['processor']
+    events = _worker['events']
+    events.clear()
+    processor.reset_stream_state(OFFLINE_STREAM)
+
+    columns = {}
+    capture = cv2.VideoCapture(path)
+    first = max(0, start - warmup_frames)
+    if first:
+        capture.set(cv2.CAP_PROP_POS_FRAMES, first)
+    index = first
+    while end is None or index < end:
+        ret, frame = capture.read()
+        if not ret:
+            break
+        _worker['frame'] = index
+        _, detections = processor.analyze_frame(OFFLINE_STREAM, frame)
+        if index >= start:
+            row = {'video': path, 'chunk': chunk, 'frame': index, 'time_s': round(index / fps, 3)}
+            for analyzer_name, result in processor.stream_results[OFFLINE_STREAM].items():
+                if isinstance(result, dict):
+                    for key, value in result.items():
+                        row[f"{analyzer_name}.{key}"] = _value(value)
+                else:
+                    row[analyzer_name] = _value(result)
+            row['detections'] = "; ".join(detections)
+            for key, value in row.items():
+                columns.setdefault(key, []).append(value)
+        index += 1
+    capture.release()
+    chunk_events = [(frame_index, analyzer_name, event) for frame_index, analyzer_name, event in events
+                    if frame_index >= start]
+    return video_index, columns, chunk_events
+
+def plan_chunks(videos, chunk_seconds, warmup_frames):
+    tasks = []
+    infos = []
+    for video_index, path in enumerate(videos):
+        capture = cv2.VideoCapture(path)
+        if not capture.isOpened():
+            print(f"Error opening video: {path}", file=sys.stderr)
+            infos.append(None)
+            continue
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        capture.release()
+        infos.append({'video': path, 'fps': fps, 'frames': frame_count})
+        if frame_count <= 0:
+            # Unknown length (some containers do not record it): one chunk, read to the end
+            tasks.append((video_index, path, 0, 0, None, fps, warmup_frames))
+            continue
+        chunk_frames = max(1, int(chunk_seconds * fps))
+        for chunk, start in enumerate(range(0, frame_count, chunk_frames)):
+            tasks.append((video_index, path, chunk, start, min(start + chunk_frames, frame_count), fps, warmup_frames))
+    return tasks, infos
+
+class CsvColumnsWriter:
+    def __init__(self, output):
+        self.file = sys.stdout if output in (None, '-') else open(output, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.header = None
+
+    def write(self, columns):
+        if not columns:
+            return
+        if self.header is None:
+            self.header = list(columns)
+            self.writer.writerow(self.header)
+        self.writer.writerows(zip(*(columns[key] for key in self.header)))
+
+    def close(self):
+        self.file.flush()
+        if self.file is not sys.stdout:
+            self.file.close()
+
+def result_columns(analyzers):
+    # (column, example value) for every column a row has, in row order; the examples are the analyzers'
+    # default results, so a column's type is known before any frame is analyzed
+    from utils.analyzers import ANALYZERS
+
+    columns = [('video', ''), ('chunk', 0), ('frame', 0), ('time_s', 0.0)]
+    for analyzer_name in analyzers:
+        result = ANALYZERS[analyzer_name].default_result
+        if isinstance(result, dict):
+            columns += [(f"{analyzer_name}.{key}", value) for key, value in result.items()]
+        else:
+            columns.append((analyzer_name, result))
+    columns.append(('detections', ''))
+    return columns
+
+class ParquetColumnsWriter:
+    # Each chunk is written as its own row group as it arrives, so memory stays at one chunk however
+    # long the footage is. The schema is declared up front from the analyzers' default results, so
+    # a column that is all null in one chunk (e.g. door movement before a door is seen) keeps its type.
+    def __init__(self, output, columns):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise SystemExit("Please install pyarrow to write Parquet: pip install pyarrow")
+        self.pa = pyarrow
+        self.schema = pyarrow.schema([(name, self.arrow_type(value)) for name, value in columns])
+        self.writer = pyarrow.parquet.ParquetWriter(output, self.schema)
+
+    def arrow_type(self, value):
+        # None defaults (labels not known yet) and lists (written as JSON by _value) are strings
+        if isinstance(value, bool):
+            return self.pa.bool_()
+        if isinstance(value, int):
+            return self.pa.int64()
+        if isinstance(value, float):
+            return self.pa.float64()
+        return self.pa.string()
+
+    def write(self, columns):
+        rows = len(columns.get('frame', []))
+        if not rows:
+            return
+        arrays = [self.pa.array(columns.get(field.name, [None] * rows), type=field.type) for field in self.schema]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+def run_offline(videos, output='-', analyzers=None, jobs=None, chunk_seconds=60.0, summary_path=None,
+                warmup_frames=30):
+    from utils.analyzers import ANALYZERS
+
+    analyzers = list(analyzers or DEFAULT_ANALYZERS)
+    unknown = [name for name in analyzers if name not in ANALYZERS]
+    if unknown:
+        print(f"Unknown analyzers: {', '.join(unknown)} (available: {', '.join(ANALYZERS)})", file=sys.stderr)
+        return 2
+    started = time.perf_counter()
+    tasks, infos = plan_chunks(videos, chunk_seconds, warmup_frames)
+    if not tasks:
+        return 1
+
+    if output.lower().endswith('.parquet'):
+        writer = ParquetColumnsWriter(output, result_columns(analyzers))
+    else:
+        writer = CsvColumnsWriter(output)
+
+    frames_done = Counter()
+    video_events = {video_index: [] for video_index in range(len(videos))}
+    error = None
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(tasks)))
+    print(f"Analyzing {len(videos)} video(s) in {len(tasks)} chunk(s) on {jobs} process(es)", file=sys.stderr)
+    context = mp.get_context('spawn')
+    try:
+        with context.Pool(jobs, initializer=_init_worker, initargs=(analyzers,)) as pool:
+            # imap hands results back in task order, so rows are written in frame order
+            # while later chunks are still being analyzed
+            for video_index, columns, events in pool.imap(_analyze_chunk, tasks):
+                if columns is None:
+                    # events carries the worker's error; leaving the with block terminates the pool
+                    error = events
+                    break
+                writer.write(columns)
+                frames_done[video_index] += len(columns.get('frame', []))
+                video_events[video_index].extend(events)
+    finally:
+        writer.close()
+    if error:
+        print(f"Error analyzing videos: {error}", file=sys.stderr)
+        return 1
+
+    elapsed = time.perf_counter() - started
+    summary = {'analyzers': analyzers, 'chunk_seconds': chunk_seconds, 'processes': jobs,
+               'processing_s': round(elapsed, 3), 'videos': []}
+    footage_s = 0.0
+    for video_index, info in enumerate(infos):
+        if info is None:
+            continue
+        duration = frames_done[video_index] / info['fps']
+        footage_s += duration
+        events = [{'frame': frame_index, 'time_s': round(frame_index / info['fps'], 3),
+                   'analyzer': analyzer_name, 'event': event}
+                  for frame_index, analyzer_name, event in video_events[video_index]]
+        summary['videos'].append({
+            'video': info['video'],
+            'frames': frames_done[video_index],
+            'duration_s': round(duration, 3),
+            'event_counts': dict(Counter(event['event'] for event in events)),
+            'events': events,
+        })
+    summary['speedup'] = round(footage_s / elapsed, 2) if elapsed > 0 else None
+
+    if summary_path is None and output not in (None, '-'):
+        summary_path = os.path.splitext(output)[0] + '.summary.json'
+    if summary_path:
+        with open(summary_path, 'w') as f:
+            json.dump(summary, f, indent=2)
+    print(f"Analyzed {footage_s:.0f} s of footage in {elapsed:.1f} s ({summary['speedup']}x real time)",
+          file=sys.stderr)
+    for video in summary['videos']:
+        counts = ", ".join(f"{event}: {count}" for event, count in video['event_counts'].items()) or "no events"
+        print(f"  {video['video']}: {counts}", file=sys.stderr)
+    return 0
@@ -0,0 +1,132 @@
+import threading
+import time
+import pytest
+from utils.url_resolver import UrlResolver
+from utils.video_processor import VideoProcessor
+
+class StubExtractor:
+    # Stands in for yt-dlp: counts extractions, hands out numbered stream URLs that expire after ttl
+    # seconds, and holds every extraction until release() when gated
+    def __init__(self, ttl=3600, gated=False):
+        self.ttl = ttl
+        self.calls = []
+        self.gate = threading.Event()
+        if not gated:
+            self.gate.set()
+
+    def release(self):
+        self.gate.set()
+
+    def __call__(self, url):
+        self.calls.append(url)
+        self.gate.wait(5)
+        return f"https://stream.example/{len(self.calls)}.m3u8?expire={time.time() + self.ttl:.3f}"
+
+@pytest.fixture
+def processor():
+    processor = VideoProcessor(warmup_models=False)
+    yield processor
+    processor.release()
+
+def test_concurrent_resolves_share_one_extraction():
+    extractor = StubExtractor(gated=True)
+    resolver = UrlResolver(extractor)
+    results = []
+
+    def resolve():
+        results.append(resolver.resolve("https://www.youtube.com/watch?v=abcdefghijk", wait=True, timeout=5))
+
+    threads = [threading.Thread(target=resolve) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    extractor.release()
+    for thread in threads:
+        thread.join(5)
+    resolver.close()
+
+    assert len(extractor.calls) == 1
+    assert len(results) == 8
+    assert set(results) == {results[0]} and results[0] is not None
+
+def test_resolve_without_wait_returns_none_until_extracted():
+    extractor = StubExtractor(gated=True)
+    resolver = UrlResolver(extractor)
+    url = "https://www.youtube.com/watch?v=abcdefghijk"
+
+    assert resolver.resolve(url) is None
+    extractor.release()
+    stream_url = resolver.resolve(url, wait=True, timeout=5)
+    assert stream_url is not None
+    assert resolver.resolve(url) == stream_url
+    assert len(extractor.calls) == 1
+    resolver.close()
+
+def test_url_spellings_share_one_cache_key(processor):
+    spellings = [
+        "https://www.youtube.com/watch?v=abcdefghijk",
+        "http://youtube.com/watch?v=abcdefghijk&t=30",
+        "https://youtu.be/abcdefghijk",
+        "youtube.com/embed/abcdefghijk",
+    ]
+    assert len({processor.source_key(url) for url in spellings}) == 1
+    assert processor.source_key("RTSP://Camera.local:554/live/") == processor.source_key("rtsp://camera.local/live")
+
+    extractor = StubExtractor()
+    resolver = UrlResolver(extractor, cache_key=processor.source_key)
+    stream_urls = {resolver.resolve(url, wait=True, timeout=5) for url in spellings}
+    resolver.close()
+
+    assert len(extractor.calls) == 1
+    assert len(stream_urls) == 1
+
+def test_expire_parameter_sets_expiry():
+    resolver = UrlResolver(StubExtractor(), default_ttl=3600)
+    expires_at = resolver.expiry(f"https://stream.example/1.m3u8?expire={int(time.time()) + 120}")
+    assert 115 < expires_at - time.monotonic() <= 120.5
+    expires_at = resolver.expiry("https://stream.example/1.m3u8")
+    assert 3595 < expires_at - time.monotonic() <= 3600
+
+def test_used_entries_refresh_before_expiry():
+    extractor = StubExtractor(ttl=0.4)
+    resolver = UrlResolver(extractor, refresh_margin=0.1)
+    url = "https://www.youtube.com/watch?v=abcdefghijk"
+
+    first = resolver.resolve(url, wait=True, timeout=5)
+    assert resolver.resolve(url) == first  # Used since the resolution, so it gets refreshed
+    time.sleep(0.5)
+    second = resolver.resolve(url)
+    resolver.close()
+
+    assert len(extractor.calls) == 2
+    assert second is not None and second != first
+
+def test_unused_entries_expire():
+    extractor = StubExtractor(ttl=0.3)
+    resolver = UrlResolver(extractor, refresh_margin=0.1)
+    url = "https://www.youtube.com/watch?v=abcdefghijk"
+
+    resolver.resolve(url, wait=True, timeout=5)
+    with resolver.lock:
+        resolver.used.clear()  # Not read since the resolution, so the entry is dropped, not refreshed
+    time.sleep(0.4)
+    assert len(extractor.calls) == 1
+    assert resolver.resolve(url) is None  # Expired: starts a new extraction
+    assert resolver.resolve(url, wait=True, timeout=5) is not None
+    resolver.close()
+
+    assert len(extractor.calls) == 2
+
+def test_invalidate_forces_new_extraction():
+    extractor = StubExtractor()
+    resolver = UrlResolver(extractor)
+    url = "https://www.youtube.com/watch?v=abcdefghijk"
+
+    first = resolver.resolve(url, wait=True, timeout=5)
+    assert resolver.resolve(url, wait=True, timeout=5) == first
+    resolver.invalidate(url)
+    second = resolver.resolve(url, wait=True, timeout=5)
+    resolver.close()
+
+    assert len(extractor.calls) == 2
+    assert second != first
@@ -0,0 +1,436 @@
+import copy
+import time
+from datetime import datetime
+import cv2
+import numpy as np
+from utils.tracking import BoxTracker, DetectionScheduler, TrackAssociator, detect_or_track
+from utils.motion_estimator import MotionEstimator
+
+# Analyzer plugins. One instance of each analyzer is shared by every camera that uses it,
+# so models are loaded once; everything camera-specific lives in the state from create_state().
+ANALYZERS = {}
+
+def register_analyzer(cls):
+    ANALYZERS[cls.name] = cls
+    return cls
+
+class AnalysisFrame:
+    # The resized BGR frame, the RGB copy analyzers draw on, and grayscale and clean RGB views computed
+    # once on demand. native is the frame as decoded; detectors and classifiers take their pixels from it
+    # (see detect and crop), never from rgb, which earlier analyzers on the stream may have annotated.
+    def __init__(self, bgr, rgb, native=None, rois=None):
+        self.bgr = bgr
+        self.rgb = rgb
+        self.native = bgr if native is None else native
+        self.rois = rois or []
+        self._gray = None
+        self._clean_rgb = None
+
+    @property
+    def gray(self):
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @property
+    def clean_rgb(self):
+        if self._clean_rgb is None:
+            self._clean_rgb = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+        return self._clean_rgb
+
+    def detect(self, detect, rgb=False):
+        # Runs detect(image) -> boxes on the whole frame, or with ROIs on each ROI cropped from the
+        # native frame; boxes come back in analysis-frame coordinates either way
+        if not self.rois:
+            return detect(self.clean_rgb if rgb else self.bgr)
+        height, width = self.native.shape[:2]
+        scale = np.array([self.bgr.shape[1] / width, self.bgr.shape[0] / height] * 2, dtype=np.float32)
+        boxes = []
+        for roi in self.rois:
+            crop, (x, y) = roi.crop(self.native)
+            if rgb:
+                crop = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+            for box in detect(crop):
+                boxes.append((np.asarray(box[:4], dtype=np.float32) + (x, y, x, y)) * scale)
+        return boxes
+
+    def crop(self, box):
+        # The native-resolution pixels under an analysis-frame box, so small faces keep their detail
+        height, width = self.native.shape[:2]
+        sx, sy = width / self.bgr.shape[1], height / self.bgr.shape[0]
+        x, y = max(int(box[0] * sx), 0), max(int(box[1] * sy), 0)
+        x1, y1 = min(max(int(box[2] * sx), x + 1), width), min(max(int(box[3] * sy), y + 1), height)
+        return self.native[y:y1, x:x1]
+
+class Analyzer:
+    name = None
+    models = ()
+    default_result = None
+
+    def __init__(self, model_loader, frame_size):
+        self.model_loader = model_loader
+        self.frame_size = frame_size
+
+    def model(self, name):
+        return self.model_loader.get(name)
+
+    def create_state(self):
+        return None
+
+    def initial_result(self):
+        return copy.deepcopy(self.default_result)
+
+    def analyze(self, frame, state, timer):
+        raise NotImplementedError
+
+    def detections(self, result):
+        return []
+
+    def events(self, previous, result):
+        # Names of the events (e.g. for clip recording) that the change from previous to result represents
+        return []
+
+    def metrics(self, result):
+        # The numeric parts of result, recorded over time by the time-series store
+        numeric = (bool, int, float, np.number, np.bool_)
+        if isinstance(result, dict):
+            return {key: value for key, value in result.items() if isinstance(value, numeric)}
+        return {'value': result} if isinstance(result, numeric) else {}
+
+def detect_faces(face_net, frame):
+    # SSD face boxes (x, y, x1, y1) above 50% confidence, clipped to the frame
+    # blobFromImage resizes while it packs the blob, so no intermediate 300x300 image is made
+    blob = cv2.dnn.blobFromImage(frame, 1.0, (300, 300), (104.0, 177.0, 123.0))
+    face_net.setInput(blob)
+    detections = face_net.forward()
+
+    h, w = frame.shape[:2]
+    face_boxes = []
+    for i in range(detections.shape[2]):
+        confidence = detections[0, 0, i, 2]
+        if confidence > 0.5:
+            box = detections[0, 0, i, 3:7] * np.array([w, h, w, h])
+            (x, y, x1, y1) = box.astype("int")
+            x, y, x1, y1 = max(x, 0), max(y, 0), min(x1, w), min(y1, h)
+            if x1 > x and y1 > y:
+                face_boxes.append((x, y, x1, y1))
+    return face_boxes
+
+class TrackingState:
+    def __init__(self, interval=5, min_confidence=0.6):
+        self.scheduler = DetectionScheduler(interval=interval, min_confidence=min_confidence)
+        self.tracker = BoxTracker()
+
+@register_analyzer
+class DoorAnalyzer(Analyzer):
+    name = 'door_detection'
+    models = ('door_model',)
+    default_result = {'detected': False, 'status': 'Unknown', 'movement': None}
+
+    movement_threshold = 5  # pixels
+    motion_threshold = 1000  # Adjust this value to fine-tune motion detection sensitivity
+
+    class State(TrackingState):
+        def __init__(self, frame_size):
+            super().__init__()
+            self.motion_estimator = MotionEstimator(frame_size)
+            self.previous_box = None
+
+    def create_state(self):
+        return self.State(self.frame_size)
+
+    def detect_doors(self, rgb_frame):
+        results = self.model('door_model')(rgb_frame)
+        if len(results[0].boxes) == 0:
+            return []
+        return [results[0].boxes[0].xyxy[0].cpu().numpy()]
+
+    def analyze(self, frame, state, timer):
+        # The YOLOv8 door model runs on keyframes; the box is tracked in between
+        gray = frame.gray
+        timer.mark('color_convert')
+        door_boxes, _ = detect_or_track(state.scheduler, state.tracker, gray,
+                                        lambda: frame.detect(self.detect_doors, rgb=True))
+        timer.mark('inference')
+        state.motion_estimator.update(gray)
+
+        result = {'detected': len(door_boxes) > 0, 'status': 'Not Detected', 'movement': None}
+        if not result['detected']:
+            state.previous_box = None
+            return result
+
+        # Get the bounding box of the detected door
+        box = door_boxes[0]
+        x1, y1, x2, y2 = map(int, box)
+        cv2.rectangle(frame.rgb, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        timer.mark('annotate')
+
+        # Detect motion only within the door region, scored against the running background
+        motion_detected = state.motion_estimator.motion_score(box) > self.motion_threshold
+
+        # Check for door movement
+        if state.previous_box is not None:
+            movement = np.mean(np.abs(box - state.previous_box))
+            if movement > self.movement_threshold or motion_detected:
+                result['movement'] = 'Moving'
+                result['status'] = 'Opening/Closing'
+            else:
+                result['movement'] = 'Static'
+                result['status'] = 'Open/Closed'
+        else:
+            result['movement'] = 'Unknown'
+            result['status'] = 'Detected'
+        state.previous_box = box
+        timer.mark('postprocess')
+
+        if motion_detected:
+            cv2.putText(frame.rgb, "Motion Detected", (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
+        timer.mark('annotate')
+        return result
+
+    def detections(self, result):
+        detections = []
+        if result['detected']:
+            detections.append(f"Door {result['status']}")
+            if result['movement']:
+                detections.append(f"Movement: {result['movement']}")
+        return detections
+
+    def events(self, previous, result):
+        return ["Door started moving"] if result['movement'] == 'Moving' and previous['movement'] != 'Moving' else []
+
+    def metrics(self, result):
+        return {'detected': result['detected'], 'moving': result['movement'] == 'Moving'}
+
+@register_analyzer
+class PeopleCountingAnalyzer(Analyzer):
+    name = 'people_counting'
+    models = ('face_net', 'gender_net')
+    default_result = {'male': 0, 'female': 0, 'unknown': 0, 'total': 0, 'visitors': 0, 'entered': 0, 'exited': 0}
+
+    gender_list = ['Male', 'Female']
+    gender_mean = (78.4263377603, 87.7689143744, 114.895847746)
+    gender_batch_size = 16  # Max faces per gender_net forward pass
+
+    # A person's gender is classified on keyframes only until the votes settle it, so gender_net
+    # runs at most max_votes times per person
+    min_votes = 3
+    max_votes = 7
+    vote_majority = 0.7
+    min_hits = 2  # Keyframes a track must be seen on before it counts as a visitor
+    count_line = 0.5  # Horizontal counting line, as a fraction of the frame height
+
+    class State(TrackingState):
+        def __init__(self):
+            super().__init__()
+            self.associator = TrackAssociator()
+            self.box_tracks = []  # The track of each box, in the order the box tracker keeps them
+            self.visitors = 0
+            self.entered = 0  # Crossed the counting line downwards
+            self.exited = 0
+
+    def create_state(self):
+        return self.State()
+
+    def detect_faces(self, frame):
+        return detect_faces(self.model('face_net'), frame)
+
+    def classify_genders(self, faces):
+        gender_net = self.model('gender_net')
+        genders = []
+        for start in range(0, len(faces), self.gender_batch_size):
+            batch = faces[start:start + self.gender_batch_size]
+            blob = cv2.dnn.blobFromImages(batch, 1.0, (227, 227), self.gender_mean, swapRB=False)
+            gender_net.setInput(blob)
+            gender_preds = gender_net.forward()
+            genders.extend(self.gender_list[pred.argmax()] for pred in gender_preds)
+        return genders
+
+    def analyze(self, frame, state, timer):
+        gray = frame.gray
+        timer.mark('color_convert')
+        face_boxes, detected = detect_or_track(state.scheduler, state.tracker, gray,
+                                               lambda: frame.detect(self.detect_faces))
+        timer.mark('inference')
+
+        if detected:
+            # Keyframe detections are matched to the tracks of the people already in view;
+            # only people whose gender is not settled yet go through gender_net
+            state.box_tracks, _ = state.associator.update(face_boxes)
+            pending = [i for i, track in enumerate(state.box_tracks) if 'gender' not in track.attributes]
+            if pending:
+                faces = [frame.crop(face_boxes[i]) for i in pending]
+                for i, gender in zip(pending, self.classify_genders(faces)):
+                    self.vote(state.box_tracks[i], gender)
+                timer.mark('inference')
+            for track in state.box_tracks:
+                if track.hits >= self.min_hits and not track.attributes.get('counted'):
+                    track.attributes['counted'] = True
+                    state.visitors += 1
+        else:
+            for track, box in zip(state.box_tracks, face_boxes):
+                track.box = np.asarray(box, dtype=np.float32)
+
+        line_y = int(self.frame_size[1] * self.count_line)
+        for track in state.box_tracks:
+            below = track.center[1] >= line_y
+            previous = track.attributes.get('below')
+            if previous is not None and below != previous:
+                if below:
+                    state.entered += 1
+                else:
+                    state.exited += 1
+            track.attributes['below'] = below
+        timer.mark('postprocess')
+
+        counts = {'Male': 0, 'Female': 0, None: 0}
+        cv2.line(frame.rgb, (0, line_y), (self.frame_size[0], line_y), (76, 86, 106), 1)
+        for box, track in zip(face_boxes, state.box_tracks):
+            (x, y, x1, y1) = map(int, box)
+            gender = self.gender(track)
+            counts[gender] += 1
+            if gender == 'Male':
+                color = (255, 0, 0)  # Blue for male
+            elif gender == 'Female':
+                color = (255, 0, 255)  # Pink for female
+            else:
+                color = (216, 222, 233)  # Grey until the first vote is in
+
+            if gender is None:
+                label = "Unknown"
+            else:
+                label = gender if 'gender' in track.attributes else f"{gender}?"
+            cv2.rectangle(frame.rgb, (x, y), (x1, y1), color, 2)
+            cv2.putText(frame.rgb, label, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+        timer.mark('annotate')
+
+        return {
+            'male': counts['Male'],
+            'female': counts['Female'],
+            'unknown': counts[None],
+            'total': sum(counts.values()),
+            'visitors': state.visitors,
+            'entered': state.entered,
+            'exited': state.exited,
+        }
+
+    def vote(self, track, gender):
+        votes = track.attributes.setdefault('gender_votes', {})
+        votes[gender] = votes.get(gender, 0) + 1
+        total = sum(votes.values())
+        leader = max(votes, key=votes.get)
+        if total >= self.max_votes or (total >= self.min_votes and votes[leader] / total >= self.vote_majority):
+            track.attributes['gender'] = leader  # Cached for as long as the track lives
+
+    def gender(self, track):
+        # The settled gender, the current leader of the votes, or None before the first vote
+        if 'gender' in track.attributes:
+            return track.attributes['gender']
+        votes = track.attributes.get('gender_votes')
+        return max(votes, key=votes.get) if votes else None
+
+    def detections(self, result):
+        detections = [f"Male: {result['male']}", f"Female: {result['female']}"]
+        if result['unknown']:
+            detections.append(f"Unknown: {result['unknown']}")
+        return detections + [f"Total: {result['total']}", f"Visitors: {result['visitors']}", f"In: {result['entered']}", f"Out: {result['exited']}"]
+
+@register_analyzer
+class CashDrawerAnalyzer(Analyzer):
+    name = 'cash_drawer'
+    default_result = False
+
+    def analyze(self, frame, state, timer):
+        return np.random.choice([True, False], p=[0.1, 0.9])
+
+    def detections(self, result):
+        return ["Cash drawer opened"] if result else []
+
+    def events(self, previous, result):
+        return ["Cash drawer opened"] if result and not previous else []
+
+@register_analyzer
+class EmployeeAnalyzer(Analyzer):
+    name = 'employee_detection'
+    default_result = True
+
+    def analyze(self, frame, state, timer):
+        return np.random.choice([True, False], p=[0.8, 0.2])
+
+    def detections(self, result):
+        return [] if result else ["No employee at cash drawer"]
+
+    def events(self, previous, result):
+        return ["Employee left the cash drawer"] if previous and not result else []
+
+@register_analyzer
+class FaceRecognitionAnalyzer(Analyzer):
+    name = 'face_recognition'
+    models = ('face_net', 'face_embedder', 'face_gallery')
+    default_result = []
+
+    match_threshold = 0.6  # Cosine similarity needed to accept a gallery match
+    repeat_seconds = 60  # Someone who stays in view is listed once, not on every keyframe
+    history_size = 5
+
+    class State(TrackingState):
+        def __init__(self):
+            super().__init__()
+            self.recognized = []  # Recently recognized employees, newest last
+            self.last_seen = {}
+            self.labels = []  # (name or None, score) per tracked box
+            self.keyframe_boxes = []
+            self.embeddings = None  # Embeddings of keyframe_boxes, kept for enrollment
+
+    def create_state(self):
+        return self.State()
+
+    def detect_faces(self, image):
+        return detect_faces(self.model('face_net'), image)
+
+    def embed_faces(self, faces):
+        embedder = self.model('face_embedder')
+        blob = cv2.dnn.blobFromImages(faces, 1.0 / 255, (96, 96), (0, 0, 0), swapRB=True)
+        embedder.setInput(blob)
+        return embedder.forward().reshape(len(faces), -1)
+
+    def analyze(self, frame, state, timer):
+        gray = frame.gray
+        timer.mark('color_convert')
+        face_boxes, detected = detect_or_track(
+            state.scheduler, state.tracker, gray, lambda: frame.detect(self.detect_faces))
+        timer.mark('inference')
+
+        if detected:
+            # Identities only change on keyframes; tracked boxes keep their order and labels
+            faces = [frame.crop(box) for box in face_boxes]
+            state.keyframe_boxes = face_boxes
+            state.embeddings = self.embed_faces(faces) if faces else None
+            state.labels = self.model('face_gallery').match(state.embeddings, self.match_threshold) if faces else []
+            timer.mark('inference')
+
+            now = time.monotonic()
+            for name, _ in state.labels:
+                if name is None:
+                    continue
+                if now - state.last_seen.get(name, float('-inf')) > self.repeat_seconds:
+                    state.recognized.append({'name': name, 'time': datetime.now().strftime("%H:%M:%S")})
+                    if len(state.recognized) > self.history_size:
+                        state.recognized.pop(0)
+                state.last_seen[name] = now
+
+        for box, (name, score) in zip(face_boxes, state.labels):
+            (x, y, x1, y1) = map(int, box)
+            color = (163, 190, 140) if name else (216, 222, 233)  # Green for employees, grey for unknown
+            cv2.rectangle(frame.rgb, (x, y), (x1, y1), color, 2)
+            cv2.putText(frame.rgb, f"{name} {score:.2f}" if name else "Unknown", (x, y - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+        timer.mark('annotate')
+        return list(state.recognized)
+
+    def enroll(self, state, name):
+        # Enrolls the largest face of the last keyframe; returns the gallery row or None
+        if state.embeddings is None:
+            return None
+        areas = [(x1 - x) * (y1 - y) for (x, y, x1, y1) in state.keyframe_boxes]
+        return self.model('face_gallery').add(name, state.embeddings[int(np.argmax(areas))])
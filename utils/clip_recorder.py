@@ -0,0 +1,167 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+import cv2
+import numpy as np
+
+class ClipRecorder:
+    # Keeps the last few seconds of one camera as JPEGs and writes pre-roll + post-roll clips on events.
+    # Encoding, buffering and writing all happen on the recorder's own thread; the caller only queues
+    # frame references, and drops them rather than wait if the thread falls behind.
+    def __init__(self, stream_name, output_dir='clips', pre_seconds=5.0, post_seconds=5.0,
+                 max_buffer_bytes=32 * 1024 * 1024, jpeg_quality=80, on_clip=None):
+        self.stream_name = stream_name
+        self.output_dir = output_dir
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.max_buffer_bytes = max_buffer_bytes
+        self.jpeg_quality = jpeg_quality
+        self.on_clip = on_clip  # on_clip(stream_name, path, events), called from the recorder thread
+
+        self.ring = deque()  # (timestamp, jpeg bytes)
+        self.ring_bytes = 0
+        self.writer = None
+        self.clip_path = None
+        self.clip_end = None
+        self.clip_events = []
+        self.dropped_frames = 0
+        self.saved_clips = 0
+
+        self.max_queued_frames = 64
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name=f"recorder-{stream_name}", daemon=True)
+        self.thread.start()
+
+    def add_frame(self, frame, timestamp=None):
+        # frame is an RGB frame that the caller does not modify afterwards
+        if self.queue.qsize() >= self.max_queued_frames:
+            self.dropped_frames += 1
+            return
+        self.queue.put(('frame', timestamp or time.monotonic(), frame))
+
+    def trigger(self, event, timestamp=None):
+        # Events are never dropped; they are tiny and decide what gets written
+        self.queue.put(('event', timestamp or time.monotonic(), event))
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join(timeout=5)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            kind, timestamp, payload = item
+            try:
+                if kind == 'frame':
+                    self._handle_frame(timestamp, payload)
+                else:
+                    self._handle_event(timestamp, payload)
+            except Exception as e:
+                print(f"Error recording {self.stream_name}: {str(e)}")
+        self._finish_clip()
+
+    def _handle_frame(self, timestamp, frame):
+        bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        ok, jpeg = cv2.imencode('.jpg', bgr, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if ok:
+            self.ring.append((timestamp, jpeg))
+            self.ring_bytes += jpeg.nbytes
+            # Bounded by both the pre-roll window and a hard memory cap
+            while self.ring and (self.ring[0][0] < timestamp - self.pre_seconds or self.ring_bytes > self.max_buffer_bytes):
+                self.ring_bytes -= self.ring.popleft()[1].nbytes
+
+        if self.writer is not None:
+            if timestamp > self.clip_end:
+                self._finish_clip()
+            else:
+                self.writer.write(bgr)
+
+    def _handle_event(self, timestamp, event):
+        if self.writer is not None:
+            # Overlapping events extend the open clip instead of starting another
+            self.clip_end = max(self.clip_end, timestamp + self.post_seconds)
+            self.clip_events.append(event)
+            return
+
+        pre_roll = [jpeg for frame_time, jpeg in self.ring if frame_time >= timestamp - self.pre_seconds]
+        if not pre_roll:
+            return
+        first = cv2.imdecode(pre_roll[0], cv2.IMREAD_COLOR)
+        h, w = first.shape[:2]
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        name = f"{self.stream_name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]}.avi"
+        self.clip_path = os.path.join(self.output_dir, name)
+        self.writer = cv2.VideoWriter(self.clip_path, cv2.VideoWriter_fourcc(*'MJPG'), self.buffer_fps(), (w, h))
+        if not self.writer.isOpened():
+            print(f"Error recording {self.stream_name}: cannot open {self.clip_path}")
+            self.writer = None
+            return
+        self.clip_end = timestamp + self.post_seconds
+        self.clip_events = [event]
+        self.writer.write(first)
+        for jpeg in pre_roll[1:]:
+            self.writer.write(cv2.imdecode(jpeg, cv2.IMREAD_COLOR))
+
+    def buffer_fps(self):
+        # Clips play back at the rate frames actually arrived, not the camera's nominal rate
+        if len(self.ring) < 2:
+            return 10.0
+        span = self.ring[-1][0] - self.ring[0][0]
+        return float(np.clip((len(self.ring) - 1) / span, 1.0, 60.0)) if span > 0 else 10.0
+
+    def _finish_clip(self):
+        if self.writer is None:
+            return
+        self.writer.release()
+        self.writer = None
+        self.saved_clips += 1
+        if self.on_clip:
+            self.on_clip(self.stream_name, self.clip_path, self.clip_events)
+
+class EventRecorder:
+    # Feeds every stream's frames to its ClipRecorder and triggers it on the events its analyzers report
+    def __init__(self, video_processor, output_dir='clips', **settings):
+        self.video_processor = video_processor
+        self.output_dir = output_dir
+        self.settings = settings
+        self.recorders = {}
+        self.callbacks = {}
+        # (stream_name, path, events) for each finished clip; drained by the owner's loop
+        self.saved_clips = deque()
+        for stream_name in list(video_processor.streams):
+            self.add_stream(stream_name)
+        video_processor.event_listeners.append(self.on_event)
+
+    def add_stream(self, stream_name):
+        if stream_name in self.recorders:
+            return
+        self.recorders[stream_name] = ClipRecorder(stream_name, self.output_dir, on_clip=self._clip_saved,
+                                                   **self.settings)
+        callback = self.callbacks[stream_name] = \
+            lambda seq, frame, detections, s=stream_name: self.on_frame(s, frame)
+        self.video_processor.subscribe(stream_name, callback)
+
+    def on_frame(self, stream_name, frame):
+        self.recorders[stream_name].add_frame(frame)
+
+    def on_event(self, stream_name, analyzer_name, event):
+        if stream_name in self.recorders:
+            self.recorders[stream_name].trigger(event)
+
+    def _clip_saved(self, stream_name, path, events):
+        self.saved_clips.append((stream_name, path, events))
+
+    def close(self):
+        if self.on_event in self.video_processor.event_listeners:
+            self.video_processor.event_listeners.remove(self.on_event)
+        for stream_name, callback in self.callbacks.items():
+            if stream_name in self.video_processor.subscribers:
+                self.video_processor.unsubscribe(stream_name, callback)
+        for recorder in self.recorders.values():
+            recorder.close()
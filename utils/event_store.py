@@ -0,0 +1,128 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    camera TEXT,
+    type TEXT NOT NULL,
+    message TEXT NOT NULL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS events_camera_time ON events (camera, time);
+CREATE INDEX IF NOT EXISTS events_type_time ON events (type, time);
+CREATE INDEX IF NOT EXISTS events_time ON events (time);
+CREATE INDEX IF NOT EXISTS events_camera_id ON events (camera, id);
+CREATE INDEX IF NOT EXISTS events_type_id ON events (type, id);
+"""
+
+class EventStore:
+    # Alerts and detection events in SQLite. add() only queues; a writer thread commits in batches,
+    # so callers on the capture, analysis or GUI threads never wait on disk.
+    def __init__(self, path='events.db', batch_size=500, flush_interval=0.5, retention_days=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.queue = queue.Queue()
+
+        connection = sqlite3.connect(path)
+        connection.execute("PRAGMA journal_mode=WAL")  # Readers never block the writer
+        connection.executescript(SCHEMA)
+        self.last_id = connection.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+        connection.close()
+
+        self.read_lock = threading.Lock()
+        self.read_connection = sqlite3.connect(path, check_same_thread=False)
+        self.thread = threading.Thread(target=self._run, name="event-store", daemon=True)
+        self.thread.start()
+
+    def add(self, event_type, message, camera=None, data=None, timestamp=None):
+        self.queue.put((timestamp or time.time(), camera, event_type, message,
+                        json.dumps(data) if data is not None else None))
+
+    def flush(self):
+        # Blocks until everything added so far is committed
+        self.queue.join()
+
+    def _run(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        last_prune = 0.0
+        running = True
+        while running:
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                batch = []
+            while batch and len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+            rows = [row for row in batch if row is not None]
+
+            try:
+                if rows:
+                    with connection:
+                        connection.executemany(
+                            "INSERT INTO events (time, camera, type, message, data) VALUES (?, ?, ?, ?, ?)", rows)
+                    self.last_id = connection.execute("SELECT MAX(id) FROM events").fetchone()[0]
+                if self.retention_days and time.monotonic() - last_prune > 3600:
+                    last_prune = time.monotonic()
+                    with connection:
+                        connection.execute("DELETE FROM events WHERE time < ?",
+                                           (time.time() - self.retention_days * 86400,))
+            except Exception as e:
+                print(f"Error writing events: {str(e)}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+        connection.close()
+
+    def _where(self, camera=None, event_type=None, since=None, until=None, min_id=None, max_id=None):
+        clauses, params = [], []
+        for clause, value in (("camera = ?", camera), ("type = ?", event_type), ("time >= ?", since),
+                              ("time < ?", until), ("id >= ?", min_id), ("id <= ?", max_id)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self, **filters):
+        where, params = self._where(**filters)
+        with self.read_lock:
+            return self.read_connection.execute(f"SELECT COUNT(*) FROM events{where}", params).fetchone()[0]
+
+    def query(self, limit=100, newest_first=True, **filters):
+        # Rows are (id, time, camera, type, message, data) in id order; filters as in count().
+        # Page with max_id (newest first) or min_id (oldest first) set past the previous page's last id:
+        # each page is an index seek, however deep into the history it is.
+        where, params = self._where(**filters)
+        order = "DESC" if newest_first else "ASC"
+        sql = f"SELECT id, time, camera, type, message, data FROM events{where} ORDER BY id {order} LIMIT ?"
+        with self.read_lock:
+            return self.read_connection.execute(sql, params + [limit]).fetchall()
+
+    def skip_id(self, max_id, rows, **filters):
+        # The id of the matching row that comes rows places after max_id, newest first (max_id itself is
+        # place 0), or None if there are not that many; lets a pager jump a page ahead without fetching it
+        where, params = self._where(max_id=max_id, **filters)
+        sql = f"SELECT id FROM events{where} ORDER BY id DESC LIMIT 1 OFFSET ?"
+        with self.read_lock:
+            row = self.read_connection.execute(sql, params + [rows]).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        if not self.thread.is_alive():
+            return
+        self.queue.put(None)
+        self.thread.join(timeout=5)
+        with self.read_lock:
+            self.read_connection.close()
@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+import numpy as np
+
+class FaceGallery:
+    # Enrolled face embeddings as an L2-normalized float32 matrix in a memory-mapped .npy file.
+    # The file is preallocated and grown by doubling, so enrolling writes one row in place and appends
+    # one line to names.jsonl, whose line count is the row count. Other processes sharing the directory
+    # read just the new lines the next time they match.
+    def __init__(self, directory='face_gallery', dim=128, initial_capacity=1024):
+        self.directory = directory
+        self.dim = dim
+        self.matrix_path = os.path.join(directory, 'embeddings.npy')
+        self.names_path = os.path.join(directory, 'names.jsonl')
+        self.lock = threading.Lock()
+        self.matrix = None
+        self.names = []  # One entry per row; an employee may have several rows
+        self.names_offset = 0
+        self.checked_at = 0.0
+
+        os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(self.matrix_path):
+            self._allocate(initial_capacity)
+        self._load()
+
+    def __len__(self):
+        return len(self.names)
+
+    def _allocate(self, capacity, previous=None):
+        # Write to a temporary file and rename it into place, so readers never see a partial matrix
+        temp_path = self.matrix_path + '.tmp'
+        matrix = np.lib.format.open_memmap(temp_path, mode='w+', dtype=np.float32, shape=(capacity, self.dim))
+        if previous is not None:
+            matrix[:len(previous)] = previous
+        matrix.flush()
+        del matrix
+        os.replace(temp_path, self.matrix_path)
+
+    def _load(self):
+        self.matrix = np.load(self.matrix_path, mmap_mode='r+')
+        if self.matrix.shape[1] != self.dim:
+            raise ValueError(f"Gallery {self.directory} holds {self.matrix.shape[1]}-d embeddings, expected {self.dim}")
+        self._read_names()
+
+    def _read_names(self):
+        # Reads only complete lines added since the last call
+        if not os.path.exists(self.names_path):
+            return
+        with open(self.names_path, 'rb') as f:
+            f.seek(self.names_offset)
+            data = f.read()
+        complete = data[:data.rfind(b'\n') + 1]
+        for line in complete.splitlines():
+            self.names.append(json.loads(line))
+        self.names_offset += len(complete)
+        if len(self.names) > self.matrix.shape[0]:
+            # Another process grew the matrix
+            self.matrix = np.load(self.matrix_path, mmap_mode='r+')
+
+    def _sync(self):
+        # Cheap check, at most once a second, for rows enrolled by another process
+        now = time.monotonic()
+        if now - self.checked_at < 1.0:
+            return
+        self.checked_at = now
+        try:
+            size = os.stat(self.names_path).st_size
+        except FileNotFoundError:
+            return
+        if size != self.names_offset:
+            self._read_names()
+
+    def add(self, name, embedding):
+        embedding = np.asarray(embedding, dtype=np.float32).reshape(self.dim)
+        norm = np.linalg.norm(embedding)
+        if norm == 0:
+            raise ValueError("Cannot enroll an all-zero embedding")
+        with self.lock:
+            self._sync()
+            row = len(self.names)
+            if row >= self.matrix.shape[0]:
+                capacity = max(1, self.matrix.shape[0]) * 2
+                previous = np.array(self.matrix[:row])
+                self.matrix = None
+                self._allocate(capacity, previous)
+                self.matrix = np.load(self.matrix_path, mmap_mode='r+')
+            # The mapping is shared, so other processes see the row as soon as it is written;
+            # the names line that follows is what makes it count
+            self.matrix[row] = embedding / norm
+            entry = {'name': name, 'enrolled': datetime.now().isoformat(timespec='seconds')}
+            line = (json.dumps(entry) + "\n").encode()
+            with open(self.names_path, 'ab') as f:
+                f.write(line)
+            self.names.append(entry)
+            self.names_offset += len(line)
+        return row
+
+    def match(self, embeddings, threshold=0.6):
+        # One matrix product scores every face in the frame against every enrolled row.
+        # Returns a (name or None, cosine similarity) pair per embedding.
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(-1, self.dim)
+        if len(embeddings) == 0:
+            return []
+        with self.lock:
+            self._sync()
+            count = len(self.names)
+            if count == 0:
+                return [(None, 0.0)] * len(embeddings)
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            scores = (embeddings / np.maximum(norms, 1e-12)) @ self.matrix[:count].T
+            best = scores.argmax(axis=1)
+            best_scores = scores[np.arange(len(embeddings)), best]
+            return [(self.names[row]['name'] if score >= threshold else None, float(score))
+                    for row, score in zip(best, best_scores)]
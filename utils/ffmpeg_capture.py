@@ -0,0 +1,148 @@
+import re
+import shutil
+import subprocess
+import threading
+import cv2
+import numpy as np
+
+_major_versions = {}
+
+def ffmpeg_major_version(ffmpeg='ffmpeg'):
+    # Major version of the ffmpeg binary, or None if it cannot be told (e.g. a git build, "N-12345-g...")
+    if ffmpeg not in _major_versions:
+        version = None
+        if shutil.which(ffmpeg) is None:
+            return None  # Reported when the capture starts
+        try:
+            output = subprocess.run([ffmpeg, '-version'], capture_output=True, timeout=5).stdout
+            match = re.match(rb'ffmpeg version n?(\d+)\.', output)
+            version = int(match.group(1)) if match else None
+        except Exception as e:
+            print(f"Error checking ffmpeg version: {str(e)}")
+        _major_versions[ffmpeg] = version
+    return _major_versions[ffmpeg]
+
+class FFmpegCapture:
+    # A cv2.VideoCapture stand-in that lets ffmpeg scale (and optionally decimate) inside the
+    # decoder and pipes raw BGR frames at analysis resolution into a few preallocated buffers.
+    # A frame returned by read() is not overwritten while a consumer holds it with hold(); each
+    # consumer holds at most one frame, and more buffers are allocated if every one is in use.
+    def __init__(self, source, frame_size=(640, 480), fps=None, realtime=False, ffmpeg='ffmpeg', buffers=3,
+                 timeout=None):
+        self.source = source
+        self.frame_size = frame_size
+        self.fps = fps or 0
+        self.frames = [np.empty((frame_size[1], frame_size[0], 3), dtype=np.uint8) for _ in range(max(3, buffers))]
+        self.frame_bytes = self.frames[0].nbytes
+        self.next_index = 0
+        self.last_read = None
+        self.opened = None  # Decided by isOpened() from the first frame, which read() then returns
+        self.pending = None
+        self.held = {}  # consumer -> frame; hold() runs on consumer threads, so it is guarded by lock
+        self.lock = threading.Lock()
+        self.process = None
+
+        command = [ffmpeg, '-nostdin', '-loglevel', 'error']
+        if str(source).lower().startswith('rtsp://'):
+            command += ['-rtsp_transport', 'tcp']
+            if timeout:
+                # Socket I/O timeout in microseconds: a dead camera ends ffmpeg instead of hanging the pipe.
+                # Before ffmpeg 5 it is -stimeout; there -timeout is a listen timeout and would make ffmpeg
+                # wait for the camera to connect to it.
+                version = ffmpeg_major_version(ffmpeg)
+                option = '-stimeout' if version is not None and version < 5 else '-timeout'
+                command += [option, str(int(timeout * 1e6))]
+        elif timeout and '://' in str(source):
+            command += ['-rw_timeout', str(int(timeout * 1e6))]
+        if realtime:
+            # Files decode faster than real time; let ffmpeg read them at their native rate
+            command.append('-re')
+        filters = []
+        if fps:
+            filters.append(f"fps={fps}")
+        filters.append(f"scale={frame_size[0]}:{frame_size[1]}:flags=area")
+        command += ['-i', str(source), '-an', '-sn', '-vf', ",".join(filters),
+                    '-pix_fmt', 'bgr24', '-f', 'rawvideo', 'pipe:1']
+
+        if shutil.which(ffmpeg) is None:
+            print(f"Error starting ffmpeg: {ffmpeg} not found on PATH")
+            return
+        try:
+            self.process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                            bufsize=self.frame_bytes)
+        except Exception as e:
+            print(f"Error starting ffmpeg: {str(e)}")
+            return
+        # Drain stderr so a chatty decoder cannot block on a full pipe
+        threading.Thread(target=self._log_errors, args=(self.process,), name="ffmpeg-stderr", daemon=True).start()
+
+    def _log_errors(self, process):
+        for line in process.stderr:
+            print(f"ffmpeg ({self.source}): {line.decode(errors='replace').rstrip()}")
+
+    def isOpened(self):
+        # ffmpeg starts just as well for a missing file or a dead URL, so the source only counts as
+        # opened once its first frame has arrived; it blocks until then, or until ffmpeg gives up
+        if self.process is None:
+            return False
+        if self.opened is None:
+            self.opened, self.pending = self._read_frame()
+        return self.opened
+
+    def read(self):
+        if self.pending is not None:
+            frame, self.pending = self.pending, None
+            return True, frame
+        return self._read_frame()
+
+    def _read_frame(self):
+        process = self.process
+        if process is None:
+            return False, None
+
+        # Skip the buffers consumers hold and the one still waiting to be picked up
+        with self.lock:
+            busy = {id(held) for held in self.held.values()}
+        busy.add(id(self.last_read))
+        for _ in range(len(self.frames)):
+            frame = self.frames[self.next_index]
+            self.next_index = (self.next_index + 1) % len(self.frames)
+            if id(frame) not in busy:
+                break
+        else:
+            frame = np.empty_like(self.frames[0])
+            self.frames.append(frame)
+
+        view = memoryview(frame).cast('B')
+        filled = 0
+        while filled < self.frame_bytes:
+            count = process.stdout.readinto(view[filled:])
+            if not count:
+                return False, None  # ffmpeg exited or the stream ended
+            filled += count
+        self.last_read = frame
+        return True, frame
+
+    def hold(self, frame, consumer=None):
+        # frame None lets go of the consumer's buffer
+        with self.lock:
+            if frame is None:
+                self.held.pop(consumer, None)
+            else:
+                self.held[consumer] = frame
+
+    def get(self, prop):
+        # FPS reads as 0: ffmpeg paces realtime sources itself, so StreamReader must not pace again
+        sizes = {cv2.CAP_PROP_FRAME_WIDTH: self.frame_size[0], cv2.CAP_PROP_FRAME_HEIGHT: self.frame_size[1]}
+        return sizes.get(prop, 0)
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        process, self.process = self.process, None
+        if process is None:
+            return
+        # Killing ffmpeg also ends a read() blocked on the pipe in the capture thread
+        process.kill()
+        process.wait()
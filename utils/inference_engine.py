@@ -0,0 +1,163 @@
+import os
+import queue
+import multiprocessing as mp
+from collections import deque
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+
+class FrameRing:
+    # Fixed-size frame slots in shared memory, so frames cross processes without pickling
+    def __init__(self, frame_size, slots, name=None):
+        self.frame_shape = (frame_size[1], frame_size[0], 3)
+        self.slots = slots
+        slot_bytes = int(np.prod(self.frame_shape))
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=slot_bytes * slots)
+            self.owner = True
+        else:
+            # Workers share the parent's resource tracker, so only the creating side unlinks
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.frames = np.ndarray((slots,) + self.frame_shape, dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        del self.frames
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+def _worker_main(rings, stream_analyzers, frame_size, task_queue, result_queue):
+    # Imported here so each worker loads its own copy of the models, lazily, on a stream's first frame
+    from utils.video_processor import VideoProcessor
+
+    attached = {stream_name: FrameRing(frame_size, slots, name) for stream_name, (name, slots) in rings.items()}
+    processor = VideoProcessor()
+    for stream_name in rings:
+        processor.add_stream(stream_name, stream_analyzers[stream_name])
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            if isinstance(task, dict):
+                _apply_settings(processor, task)
+                continue
+            _analyze_task(processor, attached, task, result_queue)
+    finally:
+        for ring in attached.values():
+            ring.close()
+
+def _apply_settings(processor, message):
+    # Settings changed in the parent, which keep the worker's copy of the stream in step with it:
+    # {'op': 'reset'|'rois'|'schedule'|'gate', 'stream_name': ..., plus the op's own values}
+    op, stream_name = message['op'], message['stream_name']
+    try:
+        if op == 'reset':
+            # A new camera: forget the old one's state, and retry models that failed before
+            processor.reset_stream_state(stream_name)
+            processor.request_models(stream_name, retry=True)
+        elif op == 'rois':
+            processor.set_rois(stream_name, message['rois'])
+        elif op == 'schedule':
+            processor.set_detection_schedule(stream_name, message['interval'], message['min_confidence'])
+        elif op == 'gate':
+            processor.set_motion_gate(stream_name, message['enabled'], **message['settings'])
+        else:
+            print(f"Unknown inference worker setting: {op}")
+    except Exception as e:
+        print(f"Error applying {op} to {stream_name} in worker: {str(e)}")
+
+def _analyze_task(processor, attached, task, result_queue):
+    # Views of the shared memory must not outlive this call, or closing the ring raises BufferError.
+    # Analyzers may keep the frame in per-stream state, so they get a copy, not the slot itself.
+    stream_name, slot, seq = task
+    slot_frame = attached[stream_name].frames[slot]
+    try:
+        rgb_frame, detections = processor.analyze_frame(stream_name, slot_frame.copy())
+        # The annotated frame goes back into the same slot; only the compact results are pickled
+        np.copyto(slot_frame, rgb_frame)
+        result_queue.put((stream_name, slot, seq, processor.stream_results[stream_name], detections))
+    except Exception as e:
+        print(f"Error analyzing {stream_name} in worker: {str(e)}")
+        result_queue.put((stream_name, slot, seq, None, None))
+
+class ProcessInferenceEngine:
+    def __init__(self, stream_analyzers, frame_size, num_workers=None, slots_per_stream=4):
+        # stream_analyzers maps each stream name to the analyzers it runs
+        self.frame_size = frame_size
+        stream_names = list(stream_analyzers)
+        num_workers = num_workers or os.cpu_count() or 1
+        num_workers = max(1, min(num_workers, len(stream_names)))
+
+        self.rings = {stream_name: FrameRing(frame_size, slots_per_stream) for stream_name in stream_names}
+        self.free_slots = {stream_name: deque(range(slots_per_stream)) for stream_name in stream_names}
+        self.dropped_frames = {stream_name: 0 for stream_name in stream_names}
+
+        # Streams are split into groups; each group is pinned to one worker so per-stream state stays put
+        context = mp.get_context('spawn')
+        self.result_queue = context.Queue()
+        self.task_queues = []
+        self.workers = []
+        self.worker_for_stream = {}
+        for index in range(num_workers):
+            group = stream_names[index::num_workers]
+            task_queue = context.Queue()
+            worker = context.Process(
+                target=_worker_main,
+                args=({s: (self.rings[s].name, slots_per_stream) for s in group},
+                      {s: stream_analyzers[s] for s in group}, frame_size, task_queue, self.result_queue),
+                name=f"inference-{index}",
+                daemon=True,
+            )
+            worker.start()
+            self.task_queues.append(task_queue)
+            self.workers.append(worker)
+            for stream_name in group:
+                self.worker_for_stream[stream_name] = index
+
+    def submit(self, stream_name, seq, frame):
+        free_slots = self.free_slots.get(stream_name)
+        if free_slots is None:
+            # Streams added after the engine started have no worker; see VideoProcessor.set_inference_engine
+            return False
+        if not free_slots:
+            # The worker is behind; drop this frame rather than queue stale work
+            self.dropped_frames[stream_name] += 1
+            return False
+        slot = free_slots.popleft()
+        cv2.resize(frame, self.frame_size, dst=self.rings[stream_name].frames[slot], interpolation=cv2.INTER_AREA)
+        self.task_queues[self.worker_for_stream[stream_name]].put((stream_name, slot, seq))
+        return True
+
+    def configure(self, stream_name, op, **values):
+        # Queued behind the stream's pending frames, so it applies from the next submitted frame on
+        if stream_name in self.worker_for_stream:
+            self.task_queues[self.worker_for_stream[stream_name]].put(dict(values, op=op, stream_name=stream_name))
+
+    def collect(self):
+        completed = []
+        while True:
+            try:
+                stream_name, slot, seq, results, detections = self.result_queue.get_nowait()
+            except queue.Empty:
+                break
+            if results is not None:
+                frame = self.rings[stream_name].frames[slot].copy()
+                completed.append((stream_name, seq, frame, results, detections))
+            self.free_slots[stream_name].append(slot)
+        return completed
+
+    def close(self):
+        for task_queue in self.task_queues:
+            task_queue.put(None)
+        for worker in self.workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        for ring in self.rings.values():
+            ring.close()
@@ -0,0 +1,120 @@
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Stage latencies run from sub-millisecond color conversion to multi-second model loads
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        # Non-cumulative bucket counts keep the hot path to one bisect and three adds
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+def _escape(value):
+    # Label values escape backslash, double quote and newline, as the text exposition format requires
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(**labels):
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+class MetricsRegistry:
+    def __init__(self, video_processor):
+        self.video_processor = video_processor
+        self.lock = threading.Lock()
+        self.stage_histograms = {}
+
+    def observe_stage(self, stream_name, stage, seconds):
+        histogram = self.stage_histograms.get((stream_name, stage))
+        if histogram is None:
+            with self.lock:
+                histogram = self.stage_histograms.setdefault((stream_name, stage), Histogram())
+        histogram.observe(seconds)
+
+    def render(self):
+        lines = []
+        with self.lock:
+            histograms = sorted(self.stage_histograms.items())
+
+        lines.append("# HELP cctv_stage_latency_seconds Time spent in each stage of frame analysis")
+        lines.append("# TYPE cctv_stage_latency_seconds histogram")
+        for (stream_name, stage), histogram in histograms:
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f"cctv_stage_latency_seconds_bucket{{{_labels(stream=stream_name, stage=stage, le=bound)}}} {cumulative}")
+            lines.append(f"cctv_stage_latency_seconds_bucket{{{_labels(stream=stream_name, stage=stage, le='+Inf')}}} {histogram.count}")
+            lines.append(f"cctv_stage_latency_seconds_sum{{{_labels(stream=stream_name, stage=stage)}}} {histogram.sum:.6f}")
+            lines.append(f"cctv_stage_latency_seconds_count{{{_labels(stream=stream_name, stage=stage)}}} {histogram.count}")
+
+        processor = self.video_processor
+        per_stream = [
+            ('cctv_frames_read_total', 'counter', "Frames taken from the capture slot for analysis",
+             lambda s: processor.frame_seq[s]),
+            ('cctv_inference_skipped_total', 'counter', "Frames the motion gate let skip inference",
+             lambda s: processor.get_skipped_inferences(s)),
+            ('cctv_capture_frames_total', 'counter', "Frames decoded by the capture thread",
+             lambda s: processor.streams[s].frame_id if processor.streams[s] else 0),
+            ('cctv_capture_dropped_frames_total', 'counter', "Decoded frames overwritten before being read",
+             lambda s: processor.get_dropped_frames(s)),
+            ('cctv_inference_dropped_frames_total', 'counter', "Frames dropped because the inference worker was busy",
+             lambda s: processor.get_inference_dropped_frames(s)),
+            ('cctv_capture_reconnects_total', 'counter', "Times the capture was reopened",
+             lambda s: processor.streams[s].reconnects if processor.streams[s] else 0),
+            ('cctv_capture_fps', 'gauge', "Smoothed decode rate of the capture thread",
+             lambda s: processor.streams[s].fps if processor.streams[s] else 0),
+            ('cctv_capture_connected', 'gauge', "1 while the camera is connected and delivering frames",
+             lambda s: int(processor.get_connection_status(s)['state'] == 'connected')),
+            ('cctv_capture_uptime_seconds', 'gauge', "Time since the current camera connection was established",
+             lambda s: f"{processor.get_connection_status(s)['uptime']:.1f}"),
+        ]
+        for name, metric_type, help_text, value in per_stream:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for stream_name in list(processor.streams):
+                lines.append(f"{name}{{{_labels(stream=stream_name)}}} {value(stream_name)}")
+
+        lines.append("# HELP cctv_detector_runs_total Heavy detector invocations (keyframes)")
+        lines.append("# TYPE cctv_detector_runs_total counter")
+        for stream_name in list(processor.streams):
+            if processor.schedulers(stream_name):
+                lines.append(f"cctv_detector_runs_total{{{_labels(stream=stream_name)}}} {processor.get_detector_runs(stream_name)}")
+        return "\n".join(lines) + "\n"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the console
+
+class MetricsServer:
+    def __init__(self, registry, port=9108, host='127.0.0.1'):
+        self.httpd = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.registry = registry
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-http", daemon=True)
+        self.thread.start()
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
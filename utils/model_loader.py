@@ -0,0 +1,118 @@
+import threading
+import time
+import cv2
+import numpy as np
+
+class ModelLoader:
+    # Loads each model once, on a background thread, the first time a stream asks for it
+    def __init__(self, preloaded=None, warmup=True, on_loaded=None, retry_delay=60.0):
+        self.models = dict(preloaded or {})
+        self.warmup = warmup
+        self.on_loaded = on_loaded  # on_loaded(name, timings), called from the loader thread
+        # A model that failed to load is not tried again for retry_delay seconds, unless asked with retry
+        self.retry_delay = retry_delay
+        self.lock = threading.Lock()
+        self.threads = {}
+        self.events = {}
+        self.timings = {}
+        self.errors = {}
+        self.failed_at = {}
+
+    def _event(self, name):
+        with self.lock:
+            event = self.events.get(name)
+            if event is None:
+                event = self.events[name] = threading.Event()
+                if name in self.models:
+                    event.set()
+            return event
+
+    def request(self, name, retry=False):
+        event = self._event(name)
+        with self.lock:
+            if name in self.models or name in self.threads:
+                return event
+            failed_at = self.failed_at.get(name)
+            if not retry and failed_at is not None and time.monotonic() - failed_at < self.retry_delay:
+                return event
+            thread = threading.Thread(target=self._load, args=(name,), name=f"load-{name}", daemon=True)
+            self.threads[name] = thread
+            event.clear()
+        thread.start()
+        return event
+
+    def get(self, name):
+        # Never blocks; None until the model is ready
+        return self.models.get(name)
+
+    def failed(self, name):
+        return name not in self.models and name in self.errors
+
+    def wait(self, name, timeout=None):
+        self.request(name).wait(timeout)
+        return self.models.get(name)
+
+    def _load(self, name):
+        timings = {}
+        try:
+            started = time.perf_counter()
+            model = getattr(self, f"_load_{name}")(timings)
+            timings['load_s'] = time.perf_counter() - started - timings.get('import_s', 0.0)
+            if self.warmup:
+                # The first forward pass allocates buffers and picks kernels; pay for it here, not on a live frame
+                started = time.perf_counter()
+                getattr(self, f"_warmup_{name}")(model)
+                timings['warmup_s'] = time.perf_counter() - started
+            self.models[name] = model
+            self.errors.pop(name, None)
+        except Exception as e:
+            print(f"Error loading {name}: {str(e)}")
+            self.errors[name] = str(e)
+            self.failed_at[name] = time.monotonic()
+        finally:
+            self.timings[name] = timings
+            with self.lock:
+                if name not in self.models:
+                    # Allow a later request to retry
+                    self.threads.pop(name, None)
+            self._event(name).set()
+            if self.on_loaded:
+                self.on_loaded(name, timings)
+
+    def _load_door_model(self, timings):
+        started = time.perf_counter()
+        from ultralytics import YOLO
+        timings['import_s'] = time.perf_counter() - started
+        return YOLO('door_detection.pt')
+
+    def _load_face_net(self, timings):
+        return cv2.dnn.readNetFromCaffe("deploy.prototxt", "res10_300x300_ssd_iter_140000.caffemodel")
+
+    def _load_gender_net(self, timings):
+        return cv2.dnn.readNetFromCaffe("gender_deploy.prototxt", "gender_net.caffemodel")
+
+    def _load_face_embedder(self, timings):
+        # OpenFace: 96x96 RGB face crop in, 128-d embedding out
+        return cv2.dnn.readNetFromTorch("openface_nn4.small2.v1.t7")
+
+    def _load_face_gallery(self, timings):
+        from utils.face_gallery import FaceGallery
+        return FaceGallery("face_gallery")
+
+    def _warmup_door_model(self, model):
+        model(np.zeros((480, 640, 3), dtype=np.uint8), verbose=False)
+
+    def _warmup_face_net(self, model):
+        model.setInput(np.zeros((1, 3, 300, 300), dtype=np.float32))
+        model.forward()
+
+    def _warmup_gender_net(self, model):
+        model.setInput(np.zeros((1, 3, 227, 227), dtype=np.float32))
+        model.forward()
+
+    def _warmup_face_embedder(self, model):
+        model.setInput(np.zeros((1, 3, 96, 96), dtype=np.float32))
+        model.forward()
+
+    def _warmup_face_gallery(self, model):
+        pass
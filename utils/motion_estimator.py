@@ -0,0 +1,44 @@
+import cv2
+import numpy as np
+
+class MotionEstimator:
+    # Running-average grayscale background at reduced resolution; all buffers are allocated once
+    def __init__(self, frame_size, scale=0.25, alpha=0.3, pixel_threshold=25):
+        self.scale = scale
+        self.alpha = alpha
+        self.pixel_threshold = pixel_threshold
+        self.small_size = (int(frame_size[0] * scale), int(frame_size[1] * scale))
+        shape = (self.small_size[1], self.small_size[0])
+
+        self.gray = np.zeros(shape, dtype=np.uint8)
+        self.background = np.zeros(shape, dtype=np.float32)
+        self.background_u8 = np.zeros(shape, dtype=np.uint8)
+        self.diff = np.zeros(shape, dtype=np.uint8)
+        self.mask = np.zeros(shape, dtype=np.uint8)
+        self.initialized = False
+
+    def update(self, gray_frame):
+        cv2.resize(gray_frame, self.small_size, dst=self.gray, interpolation=cv2.INTER_AREA)
+        if not self.initialized:
+            self.background[:] = self.gray
+            self.initialized = True
+            return
+
+        cv2.convertScaleAbs(self.background, dst=self.background_u8)
+        cv2.absdiff(self.gray, self.background_u8, dst=self.diff)
+        cv2.threshold(self.diff, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=self.mask)
+        cv2.accumulateWeighted(self.gray, self.background, self.alpha)
+
+    def motion_score(self, box):
+        # Changed pixels inside the box, in full-resolution pixel units; the box is just a view
+        h, w = self.mask.shape
+        x1, y1, x2, y2 = (int(v * self.scale) for v in box)
+        x1, y1 = min(max(x1, 0), w), min(max(y1, 0), h)
+        x2, y2 = min(max(x2, x1), w), min(max(y2, y1), h)
+        if x2 == x1 or y2 == y1:
+            return 0.0
+        return cv2.countNonZero(self.mask[y1:y2, x1:x2]) / (self.scale * self.scale)
+
+    def reset(self):
+        self.initialized = False
+        self.mask[:] = 0
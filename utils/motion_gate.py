@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+
+class MotionGate:
+    # Cheap full-frame change check on a tiny grayscale copy, run before any detector
+    def __init__(self, scale_size=(80, 60), pixel_threshold=25, on_fraction=0.01, off_fraction=0.004,
+                 hold_frames=10, refresh_interval=150):
+        self.scale_size = scale_size
+        self.pixel_threshold = pixel_threshold
+        self.on_fraction = on_fraction  # Changed-pixel share that switches the gate on
+        self.off_fraction = off_fraction  # ...and the share it must stay under to switch off
+        self.hold_frames = hold_frames  # Quiet frames needed before the gate closes
+        self.refresh_interval = refresh_interval  # Force a real analysis at least this often
+
+        self.reference = None
+        self.active = True
+        self.quiet_frames = 0
+        self.frames_since_refresh = 0
+        self.last_fraction = 0.0
+        self.analyzed_frames = 0
+        self.skipped_frames = 0
+
+    def should_analyze(self, frame):
+        small = cv2.resize(frame, self.scale_size, interpolation=cv2.INTER_AREA)
+        gray = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (3, 3), 0)
+
+        if self.reference is not None:
+            # Compared against the last analyzed frame, so slow drift still opens the gate eventually
+            diff = cv2.absdiff(gray, self.reference)
+            self.last_fraction = np.count_nonzero(diff > self.pixel_threshold) / diff.size
+            if self.last_fraction >= self.on_fraction:
+                self.active = True
+                self.quiet_frames = 0
+            elif self.last_fraction < self.off_fraction:
+                self.quiet_frames += 1
+                if self.quiet_frames >= self.hold_frames:
+                    self.active = False
+            else:
+                self.quiet_frames = 0
+
+        self.frames_since_refresh += 1
+        analyze = self.active or self.reference is None or self.frames_since_refresh >= self.refresh_interval
+        if analyze:
+            self.reference = gray
+            self.frames_since_refresh = 0
+            self.analyzed_frames += 1
+        else:
+            self.skipped_frames += 1
+        return analyze
+
+    def reset(self):
+        self.reference = None
+        self.active = True
+        self.quiet_frames = 0
+        self.frames_since_refresh = 0
@@ -0,0 +1,59 @@
+import cv2
+import numpy as np
+
+class Roi:
+    # A region of interest in fractions of the frame, so it applies at any resolution.
+    # Four numbers are a rectangle (x1, y1, x2, y2); six or more are polygon points x, y, x, y, ...
+    def __init__(self, values):
+        values = np.asarray(values, dtype=np.float32).reshape(-1)
+        if len(values) == 4:
+            self.polygon = None
+            self.box = tuple(float(v) for v in values)
+        elif len(values) >= 6 and len(values) % 2 == 0:
+            self.polygon = values.reshape(-1, 2)
+            (x1, y1), (x2, y2) = self.polygon.min(axis=0), self.polygon.max(axis=0)
+            self.box = (float(x1), float(y1), float(x2), float(y2))
+        else:
+            raise ValueError(f"An ROI needs 4 numbers (a rectangle) or 3+ x, y points, got {len(values)} numbers")
+        x1, y1, x2, y2 = self.box
+        if not (0.0 <= x1 < x2 <= 1.0 and 0.0 <= y1 < y2 <= 1.0):
+            raise ValueError(f"ROI {self.to_list()} must lie within 0..1 and have a non-zero area")
+
+    def to_list(self):
+        return [round(float(v), 4) for v in (self.polygon.reshape(-1) if self.polygon is not None else self.box)]
+
+    def pixel_box(self, width, height):
+        x1, y1, x2, y2 = self.box
+        return (int(x1 * width), int(y1 * height),
+                max(int(np.ceil(x2 * width)), int(x1 * width) + 1), max(int(np.ceil(y2 * height)), int(y1 * height) + 1))
+
+    def crop(self, image):
+        # Returns (crop, (x offset, y offset)); a polygon's pixels outside it are blacked out
+        height, width = image.shape[:2]
+        x1, y1, x2, y2 = self.pixel_box(width, height)
+        crop = image[y1:y2, x1:x2]
+        if self.polygon is not None:
+            mask = np.zeros(crop.shape[:2], dtype=np.uint8)
+            points = np.round(self.polygon * (width, height) - (x1, y1)).astype(np.int32)
+            cv2.fillPoly(mask, [points], 255)
+            crop = cv2.bitwise_and(crop, crop, mask=mask)
+        return crop, (x1, y1)
+
+    def draw(self, image, color, thickness=1):
+        height, width = image.shape[:2]
+        if self.polygon is None:
+            x1, y1, x2, y2 = self.pixel_box(width, height)
+            cv2.rectangle(image, (x1, y1), (x2 - 1, y2 - 1), color, thickness)
+        else:
+            points = np.round(self.polygon * (width, height)).astype(np.int32)
+            cv2.polylines(image, [points], True, color, thickness)
+
+def parse_rois(value):
+    # Accepts ROIs as a list (of number lists or of [x, y] points) or as text, e.g.
+    # "0.1,0.2,0.6,0.9; 0.5,0.1, 0.9,0.1, 0.7,0.5" (a rectangle and a triangle). Empty means the whole frame.
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = [[float(number) for number in part.split(',') if number.strip()]
+                 for part in value.split(';') if part.strip()]
+    return [item if isinstance(item, Roi) else Roi(item) for item in value]
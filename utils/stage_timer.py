@@ -0,0 +1,26 @@
+import time
+
+class StageTimer:
+    # Attributes the time since the previous mark to the named stage
+    def __init__(self, sink, stream_name):
+        self.sink = sink
+        self.stream_name = stream_name
+        self.started = self.last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.sink(self.stream_name, stage, now - self.last)
+        self.last = now
+
+    def total(self, stage='total'):
+        self.sink(self.stream_name, stage, time.perf_counter() - self.started)
+
+class _NullStageTimer:
+    def mark(self, stage):
+        pass
+
+    def total(self, stage='total'):
+        pass
+
+# Shared no-op timer used when nobody is collecting timings
+NULL_STAGE_TIMER = _NullStageTimer()
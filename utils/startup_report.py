@@ -0,0 +1,44 @@
+import sys
+import time
+from contextlib import contextmanager
+
+class StartupReport:
+    # Wall-clock breakdown of application startup, printed to stderr
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.entries = []
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name, seconds):
+        self.entries.append((name, seconds))
+
+    def add_model(self, name, timings):
+        # Matches ModelLoader's on_loaded callback; models finish after the window is already up
+        for step in ('import_s', 'load_s', 'warmup_s'):
+            if step in timings:
+                self.add(f"{name} {step[:-2]}", timings[step])
+        if self.enabled:
+            details = ", ".join(f"{step[:-2]} {seconds * 1000:.0f} ms" for step, seconds in timings.items())
+            print(f"[startup] {name} ready after {self.elapsed() * 1000:.0f} ms ({details})", file=sys.stderr)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def format(self):
+        lines = [f"{'phase':<32} {'ms':>9}"]
+        for name, seconds in self.entries:
+            lines.append(f"{name:<32} {seconds * 1000:>9.1f}")
+        lines.append(f"{'since start':<32} {self.elapsed() * 1000:>9.1f}")
+        return "\n".join(lines)
+
+    def print(self):
+        if self.enabled:
+            print(self.format(), file=sys.stderr)
@@ -0,0 +1,216 @@
+import random
+import threading
+import time
+import cv2
+
+class StreamReader:
+    # With open_capture, the capture thread also owns the connection: it connects in the background,
+    # treats a stream that delivers nothing for stall_timeout seconds as lost, and reconnects with
+    # jittered exponential backoff. Several streams can share one reader, and so one connection and
+    # one decode, through attach(); the reader is released when the last of them lets go.
+    def __init__(self, capture, stream_name, paced=False, open_capture=None, stall_timeout=5.0,
+                 initial_backoff=0.5, max_backoff=30.0):
+        self.capture = capture
+        self.stream_name = stream_name
+        self.paced = paced
+        self.open_capture = open_capture
+        self.stall_timeout = stall_timeout
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.frame_interval = 0
+
+        self.lock = threading.Lock()
+        self.frame = None
+        self.frame_id = 0
+        self.consumed_id = 0
+        self.dropped_frames = 0
+        self.failed_reads = 0
+        self.connections = 0 if capture is None else 1
+        self.reconnects = 0
+        self.fps = 0.0
+        self.last_frame_time = None
+        self.state = 'connecting' if capture is None else 'connected'
+        self.connected_since = None if capture is None else time.monotonic()
+        self.refs = 0
+        self.stopped = threading.Event()
+        if capture is not None:
+            self._set_pacing()
+
+        self.thread = threading.Thread(target=self._run, name=f"capture-{stream_name}", daemon=True)
+        self.thread.start()
+
+    @property
+    def running(self):
+        return not self.stopped.is_set()
+
+    def _set_pacing(self):
+        # Files decode faster than real time, so pace them to their native FPS
+        fps = self.capture.get(cv2.CAP_PROP_FPS) if self.paced else 0
+        self.frame_interval = 1.0 / fps if fps and fps > 0 else 0
+
+    def _connect(self):
+        failures = 0
+        while self.running:
+            capture = self.open_capture()
+            if capture is not None and capture.isOpened():
+                with self.lock:
+                    if not self.running:
+                        capture.release()
+                        return False
+                    self.capture = capture
+                if self.connections:
+                    self.reconnects += 1
+                self.connections += 1
+                self.connected_since = time.monotonic()
+                self.last_frame_time = None
+                self.state = 'connected'
+                self._set_pacing()
+                print(f"Connected to stream for {self.stream_name}")
+                return True
+            if capture is not None:
+                capture.release()
+
+            # Jitter keeps cameras that dropped together from reconnecting in lockstep
+            delay = min(self.max_backoff, self.initial_backoff * 2 ** failures)
+            failures += 1
+            self.state = 'backoff'
+            self.stopped.wait(random.uniform(delay / 2, delay))
+            self.state = 'connecting'
+        return False
+
+    def _disconnect(self):
+        with self.lock:
+            capture, self.capture = self.capture, None
+        self.state = 'connecting'
+        self.connected_since = None
+        if capture is not None:
+            capture.release()
+
+    def _run(self):
+        while self.running:
+            # A local reference: release() may run on another thread at any point
+            capture = self.capture
+            if capture is None:
+                if not self._connect():
+                    break
+                capture = self.capture
+
+            started = time.monotonic()
+            ret, frame = capture.read()
+            if not ret:
+                self.failed_reads += 1
+                if self.open_capture is not None:
+                    last_seen = self.last_frame_time or self.connected_since
+                    if time.monotonic() - last_seen > self.stall_timeout:
+                        # Stalled or ended: drop the connection and let _connect back off and retry
+                        print(f"Stream for {self.stream_name} stalled; reconnecting")
+                        self._disconnect()
+                        continue
+                time.sleep(0.05)  # Avoid spinning on a dead or finished stream
+                continue
+
+            with self.lock:
+                self.frame = frame
+                self.frame_id += 1
+
+            # Smoothed decode rate, for diagnostics
+            now = time.monotonic()
+            if self.last_frame_time is not None and now > self.last_frame_time:
+                self.fps = 0.9 * self.fps + 0.1 / (now - self.last_frame_time)
+            self.last_frame_time = now
+
+            if self.frame_interval:
+                remaining = self.frame_interval - (time.monotonic() - started)
+                if remaining > 0:
+                    time.sleep(remaining)
+        # Released here, by the only thread that reads from it, so it is never released mid-read
+        self._disconnect()
+
+    def read(self, consumer=None):
+        # Never blocks: returns the newest frame if one arrived since consumer's last read.
+        # consumer is a StreamView, or None for the reader's own position.
+        consumer = consumer or self
+        with self.lock:
+            if self.frame is None or consumer.consumed_id == self.frame_id:
+                return False, None
+            # Frames decoded since the last read were never picked up, so they were dropped
+            if consumer.consumed_id:
+                consumer.dropped_frames += self.frame_id - consumer.consumed_id - 1
+            consumer.consumed_id = self.frame_id
+            # Captures that recycle frame buffers must not overwrite the one handed out
+            if hasattr(self.capture, 'hold'):
+                self.capture.hold(self.frame, consumer)
+            return True, self.frame
+
+    def attach(self, stream_name):
+        with self.lock:
+            self.refs += 1
+        return StreamView(self, stream_name)
+
+    def detach(self, view):
+        with self.lock:
+            if hasattr(self.capture, 'hold'):
+                self.capture.hold(None, view)
+            self.refs -= 1
+            last = self.refs <= 0
+        if last:
+            self.release()
+
+    def connection_state(self):
+        # 'connecting', 'backoff', 'connected', 'stalled' (connected but no recent frames) or 'stopped'
+        if not self.running:
+            return 'stopped'
+        if self.state == 'connected' and self.last_frame_time is not None \
+                and time.monotonic() - self.last_frame_time > self.stall_timeout:
+            return 'stalled'
+        return self.state
+
+    def uptime(self):
+        # Seconds since the current connection was established; 0 while disconnected
+        if self.connected_since is None:
+            return 0.0
+        return time.monotonic() - self.connected_since
+
+    def release(self):
+        # Never blocks: the capture thread releases the capture once its current read returns
+        self.stopped.set()
+
+class StreamView:
+    # One stream's handle on a shared StreamReader, with its own read position and dropped-frame count.
+    # Every view gets the same decoded frame objects, which consumers must treat as read-only.
+    def __init__(self, reader, stream_name):
+        self.reader = reader
+        self.stream_name = stream_name
+        self.consumed_id = 0
+        self.dropped_frames = 0
+        self.released = False
+
+    @property
+    def running(self):
+        return self.reader.running
+
+    @property
+    def frame_id(self):
+        return self.reader.frame_id
+
+    @property
+    def reconnects(self):
+        return self.reader.reconnects
+
+    @property
+    def fps(self):
+        return self.reader.fps
+
+    def read(self):
+        return self.reader.read(self)
+
+    def connection_state(self):
+        return self.reader.connection_state()
+
+    def uptime(self):
+        return self.reader.uptime()
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.reader.detach(self)
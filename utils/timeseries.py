@@ -0,0 +1,194 @@
+import json
+import os
+import threading
+import time
+import numpy as np
+
+# (bucket seconds, buckets kept): per second for an hour, per minute for a day, per hour for 30 days
+RESOLUTIONS = ((1, 3600), (60, 1440), (3600, 720))
+
+class RollupRing:
+    # One resolution of one camera's metrics: capacity buckets of step seconds, each holding count, sum,
+    # min and max per metric column. A bucket's slot is reused once the ring wraps, so memory is fixed.
+    def __init__(self, step, capacity, width):
+        self.step = step
+        self.capacity = capacity
+        self.buckets = np.full(capacity, -1, dtype=np.int64)
+        self.count = np.zeros((capacity, width), dtype=np.int64)
+        self.sum = np.zeros((capacity, width), dtype=np.float64)
+        self.min = np.full((capacity, width), np.inf, dtype=np.float64)
+        self.max = np.full((capacity, width), -np.inf, dtype=np.float64)
+
+    def widen(self, width):
+        extra = width - self.count.shape[1]
+        if extra <= 0:
+            return
+        self.count = np.pad(self.count, ((0, 0), (0, extra)))
+        self.sum = np.pad(self.sum, ((0, 0), (0, extra)))
+        self.min = np.pad(self.min, ((0, 0), (0, extra)), constant_values=np.inf)
+        self.max = np.pad(self.max, ((0, 0), (0, extra)), constant_values=-np.inf)
+
+    def add(self, timestamp, values, present, lows, highs):
+        # values has one entry per column and present marks the columns this sample carries;
+        # lows and highs are values with the absent columns at +inf and -inf
+        bucket = int(timestamp // self.step)
+        slot = bucket % self.capacity
+        if self.buckets[slot] != bucket:
+            if bucket < self.buckets[slot]:
+                return  # Older than anything the ring still holds
+            self.buckets[slot] = bucket
+            self.count[slot] = 0
+            self.sum[slot] = 0.0
+            self.min[slot] = np.inf
+            self.max[slot] = -np.inf
+        self.count[slot] += present
+        self.sum[slot] += values
+        np.minimum(self.min[slot], lows, out=self.min[slot])
+        np.maximum(self.max[slot], highs, out=self.max[slot])
+
+    def covers(self, start):
+        # Whether the ring still holds the bucket containing start
+        latest = int(self.buckets.max())
+        return latest >= 0 and (latest - self.capacity + 1) * self.step <= start
+
+    def query(self, column, start, end):
+        first, last = int(start // self.step), int(end // self.step)
+        slots = np.nonzero((self.buckets >= first) & (self.buckets <= last) & (self.count[:, column] > 0))[0]
+        slots = slots[np.argsort(self.buckets[slots])]
+        count = self.count[slots, column]
+        return {
+            'time': self.buckets[slots] * float(self.step),
+            'mean': self.sum[slots, column] / count,
+            'min': self.min[slots, column],
+            'max': self.max[slots, column],
+            'count': count,
+        }
+
+class CameraSeries:
+    def __init__(self, resolutions):
+        self.metrics = {}  # metric name -> column
+        self.rings = [RollupRing(step, capacity, 0) for step, capacity in resolutions]
+
+    def columns(self, names):
+        new = [name for name in names if name not in self.metrics]
+        if new:
+            for name in new:
+                self.metrics[name] = len(self.metrics)
+            for ring in self.rings:
+                ring.widen(len(self.metrics))
+        return [self.metrics[name] for name in names]
+
+class TimeSeriesStore:
+    # Per-camera metric history in preallocated NumPy rings at several resolutions. record() is O(1)
+    # in the length of history; queries are vectorized over the ring of the chosen resolution.
+    # With snapshot_path the rings are saved periodically (and on close) and reloaded on startup.
+    def __init__(self, resolutions=RESOLUTIONS, snapshot_path=None, snapshot_interval=60.0):
+        self.resolutions = tuple((step, capacity) for step, capacity in resolutions)
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.lock = threading.Lock()
+        self.cameras = {}
+
+        self.stopped = threading.Event()
+        self.thread = None
+        if snapshot_path:
+            if os.path.exists(snapshot_path):
+                try:
+                    self.load(snapshot_path)
+                except Exception as e:
+                    print(f"Error loading time series snapshot: {str(e)}")
+            self.thread = threading.Thread(target=self._run, name="timeseries-snapshot", daemon=True)
+            self.thread.start()
+
+    def record(self, camera, metrics, timestamp=None):
+        # metrics maps metric names to numbers (bools count as 0/1)
+        if not metrics:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        with self.lock:
+            series = self.cameras.get(camera)
+            if series is None:
+                series = self.cameras[camera] = CameraSeries(self.resolutions)
+            columns = series.columns(list(metrics))
+            width = len(series.metrics)
+            values = np.zeros(width, dtype=np.float64)
+            present = np.zeros(width, dtype=np.int64)
+            values[columns] = [float(value) for value in metrics.values()]
+            present[columns] = 1
+            lows = np.where(present, values, np.inf)
+            highs = np.where(present, values, -np.inf)
+            for ring in series.rings:
+                ring.add(timestamp, values, present, lows, highs)
+
+    def metrics(self, camera):
+        with self.lock:
+            series = self.cameras.get(camera)
+            return list(series.metrics) if series else []
+
+    def query(self, camera, metric, start=None, end=None, step=None):
+        # Buckets of metric between start and end (unix seconds; default the last hour) as arrays
+        # 'time' (bucket start), 'mean', 'min', 'max' and 'count'. step picks a resolution; by default
+        # it is the finest one whose history reaches back to start.
+        end = time.time() if end is None else end
+        start = end - 3600 if start is None else start
+        with self.lock:
+            series = self.cameras.get(camera)
+            if series is None or metric not in series.metrics:
+                return {'time': np.empty(0), 'mean': np.empty(0), 'min': np.empty(0), 'max': np.empty(0),
+                        'count': np.empty(0, dtype=np.int64)}
+            if step is not None:
+                ring = next((ring for ring in series.rings if ring.step == step), None)
+                if ring is None:
+                    raise ValueError(f"No {step} s resolution; available: {[s for s, _ in self.resolutions]}")
+            else:
+                ring = next((ring for ring in series.rings if ring.covers(start)), series.rings[-1])
+            return ring.query(series.metrics[metric], start, end)
+
+    def snapshot(self, path=None):
+        path = path or self.snapshot_path
+        arrays = {}
+        index = {'resolutions': self.resolutions, 'cameras': {}}
+        with self.lock:
+            for c, (camera, series) in enumerate(self.cameras.items()):
+                index['cameras'][camera] = {'key': f"c{c}", 'metrics': list(series.metrics)}
+                for r, ring in enumerate(series.rings):
+                    for field in ('buckets', 'count', 'sum', 'min', 'max'):
+                        arrays[f"c{c}_r{r}_{field}"] = getattr(ring, field).copy()
+        # Written beside the target and renamed over it, so a crash never leaves a torn snapshot
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            np.savez(f, index=np.array(json.dumps(index)), **arrays)
+        os.replace(temp_path, path)
+
+    def load(self, path):
+        with np.load(path, allow_pickle=False) as data:
+            index = json.loads(str(data['index']))
+            if tuple(map(tuple, index['resolutions'])) != self.resolutions:
+                print("Time series snapshot uses other resolutions; starting empty")
+                return
+            cameras = {}
+            for camera, entry in index['cameras'].items():
+                series = cameras[camera] = CameraSeries(self.resolutions)
+                series.columns(entry['metrics'])
+                for r, ring in enumerate(series.rings):
+                    for field in ('buckets', 'count', 'sum', 'min', 'max'):
+                        setattr(ring, field, data[f"{entry['key']}_r{r}_{field}"])
+        with self.lock:
+            self.cameras = cameras
+
+    def _run(self):
+        while not self.stopped.wait(self.snapshot_interval):
+            try:
+                self.snapshot()
+            except Exception as e:
+                print(f"Error saving time series snapshot: {str(e)}")
+
+    def close(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
+            try:
+                self.snapshot()
+            except Exception as e:
+                print(f"Error saving time series snapshot: {str(e)}")
@@ -0,0 +1,163 @@
+import cv2
+import numpy as np
+
+class DetectionScheduler:
+    # Decides when the heavy detector must run; the tracker fills the frames in between
+    def __init__(self, interval=5, min_confidence=0.6):
+        self.interval = interval
+        self.min_confidence = min_confidence
+        self.frames_since_detection = None
+        self.detector_runs = 0
+        self.tracked_frames = 0
+
+    def detection_due(self):
+        return self.frames_since_detection is None or self.frames_since_detection >= self.interval - 1
+
+    def record_detection(self):
+        self.frames_since_detection = 0
+        self.detector_runs += 1
+
+    def record_tracked(self):
+        self.frames_since_detection += 1
+        self.tracked_frames += 1
+
+class BoxTracker:
+    # Propagates boxes between keyframes with sparse Lucas-Kanade optical flow
+    def __init__(self, max_points=20, max_fb_error=1.0):
+        self.max_points = max_points
+        self.max_fb_error = max_fb_error
+        self.lk_params = dict(winSize=(15, 15), maxLevel=2,
+                              criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+        self.prev_gray = None
+        self.boxes = []
+        self.points = []
+
+    def reset(self, gray, boxes):
+        self.prev_gray = gray
+        self.boxes = [np.array(box, dtype=np.float32) for box in boxes]
+        self.points = [self._select_points(gray, box) for box in self.boxes]
+
+    def _select_points(self, gray, box):
+        h, w = gray.shape
+        x1, y1 = max(int(box[0]), 0), max(int(box[1]), 0)
+        x2, y2 = min(int(box[2]), w), min(int(box[3]), h)
+        if x2 - x1 < 8 or y2 - y1 < 8:
+            return np.empty((0, 1, 2), dtype=np.float32)
+
+        points = cv2.goodFeaturesToTrack(gray[y1:y2, x1:x2], self.max_points, 0.01, 3)
+        if points is None or len(points) < 4:
+            # Flat regions such as plain doors have few corners; fall back to a grid
+            xs, ys = np.meshgrid(np.linspace(2, x2 - x1 - 3, 4), np.linspace(2, y2 - y1 - 3, 4))
+            points = np.stack([xs.ravel(), ys.ravel()], axis=1)
+        points = points.reshape(-1, 2) + (x1, y1)
+        return points.reshape(-1, 1, 2).astype(np.float32)
+
+    def update(self, gray):
+        # Returns the propagated boxes and the lowest per-box tracking confidence
+        if self.prev_gray is None:
+            return [], 0.0
+        if not self.boxes:
+            self.prev_gray = gray
+            return [], 1.0
+
+        owners = np.concatenate([np.full(len(p), i) for i, p in enumerate(self.points)])
+        if len(owners) == 0:
+            return [], 0.0
+        points = np.concatenate(self.points)
+
+        # Forward-backward check rejects points that drifted onto something else
+        next_points, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, points, None, **self.lk_params)
+        back_points, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self.prev_gray, next_points, None, **self.lk_params)
+        fb_error = np.linalg.norm((points - back_points).reshape(-1, 2), axis=1)
+        good = (status.ravel() == 1) & (back_status.ravel() == 1) & (fb_error < self.max_fb_error)
+
+        confidence = 1.0
+        for i, box in enumerate(self.boxes):
+            mine = owners == i
+            kept = mine & good
+            confidence = min(confidence, kept.sum() / mine.sum() if mine.any() else 0.0)
+            if kept.sum() >= 3:
+                dx, dy = np.median((next_points[kept] - points[kept]).reshape(-1, 2), axis=0)
+                box += (dx, dy, dx, dy)
+            self.points[i] = next_points[kept]
+
+        self.prev_gray = gray
+        return [box.copy() for box in self.boxes], confidence
+
+def detect_or_track(scheduler, tracker, gray, detect):
+    # Returns (boxes, detected); detected is True when the heavy detector ran on this frame
+    if not scheduler.detection_due():
+        boxes, confidence = tracker.update(gray)
+        if confidence >= scheduler.min_confidence:
+            scheduler.record_tracked()
+            return boxes, False
+
+    # Keyframe, or the tracker lost confidence: re-run the detector
+    boxes = detect()
+    tracker.reset(gray, boxes)
+    scheduler.record_detection()
+    return boxes, True
+
+def box_iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+class Track:
+    # One object followed across keyframes; analyzers cache per-object attributes in attributes
+    def __init__(self, track_id, box):
+        self.id = track_id
+        self.box = np.array(box, dtype=np.float32)
+        self.hits = 1
+        self.missed = 0
+        self.attributes = {}
+
+    @property
+    def center(self):
+        return (self.box[0] + self.box[2]) / 2, (self.box[1] + self.box[3]) / 2
+
+class TrackAssociator:
+    # Gives keyframe detections stable identities by greedy IoU matching against the live tracks.
+    # A track not matched for max_missed keyframes in a row is dropped, and its attributes with it.
+    def __init__(self, iou_threshold=0.3, max_missed=2):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.tracks = []
+        self.next_id = 1
+
+    def update(self, boxes):
+        # Returns (the track for each box, in order; the tracks dropped by this update)
+        pairs = sorted(((box_iou(track.box, box), t, b) for t, track in enumerate(self.tracks)
+                        for b, box in enumerate(boxes)), reverse=True)
+        assigned = [None] * len(boxes)
+        matched_tracks = set()
+        for iou, t, b in pairs:
+            if iou < self.iou_threshold:
+                break
+            if t in matched_tracks or assigned[b] is not None:
+                continue
+            track = self.tracks[t]
+            track.box = np.array(boxes[b], dtype=np.float32)
+            track.hits += 1
+            track.missed = 0
+            assigned[b] = track
+            matched_tracks.add(t)
+
+        dropped = []
+        kept = []
+        for t, track in enumerate(self.tracks):
+            if t not in matched_tracks:
+                track.missed += 1
+                if track.missed > self.max_missed:
+                    dropped.append(track)
+                    continue
+            kept.append(track)
+        for b, box in enumerate(boxes):
+            if assigned[b] is None:
+                assigned[b] = Track(self.next_id, box)
+                self.next_id += 1
+                kept.append(assigned[b])
+        self.tracks = kept
+        return assigned, dropped
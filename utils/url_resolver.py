@@ -0,0 +1,110 @@
+import threading
+import time
+from urllib.parse import urlparse, parse_qs
+
+class UrlResolver:
+    # Resolves page URLs (YouTube, HLS) to playable stream URLs on background threads and caches
+    # them until shortly before they expire. Callers asking for a source that is already being
+    # resolved share that resolution instead of running the extractor again.
+    def __init__(self, extractor, cache_key=None, default_ttl=3600, refresh_margin=600):
+        self.extractor = extractor  # extractor(url) -> stream URL or None
+        self.cache_key = cache_key or (lambda url: url)  # Maps equivalent URLs to one cache entry
+        self.default_ttl = default_ttl
+        self.refresh_margin = refresh_margin
+        self.lock = threading.Lock()
+        self.cache = {}  # key -> (stream_url, expires_at)
+        self.used = set()
+        self.threads = {}
+        self.events = {}
+        self.timers = {}
+        self.extractions = 0
+
+    def expiry(self, stream_url):
+        # googlevideo URLs carry their expiry as a unix timestamp
+        try:
+            expire = parse_qs(urlparse(stream_url).query).get('expire')
+            if expire:
+                return time.monotonic() + (float(expire[0]) - time.time())
+        except ValueError:
+            pass
+        return time.monotonic() + self.default_ttl
+
+    def resolve(self, url, wait=False, timeout=None):
+        # Never blocks unless wait is set; returns None while the first resolution is in flight
+        key = self.cache_key(url)
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self.used.add(key)
+                return entry[0]
+        event = self._start(key, url)
+        if not wait:
+            return None
+        event.wait(timeout)
+        with self.lock:
+            entry = self.cache.get(key)
+            self.used.add(key)
+        return entry[0] if entry else None
+
+    def invalidate(self, url):
+        # Called when a read fails: the next resolve() extracts a fresh URL
+        key = self.cache_key(url)
+        with self.lock:
+            self.cache.pop(key, None)
+            timer = self.timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+    def _start(self, key, url):
+        with self.lock:
+            if key in self.threads:
+                return self.events[key]
+            event = self.events[key] = threading.Event()
+            thread = self.threads[key] = threading.Thread(
+                target=self._resolve, args=(key, url), name="resolve-url", daemon=True)
+        thread.start()
+        return event
+
+    def _resolve(self, key, url):
+        stream_url = None
+        try:
+            self.extractions += 1
+            stream_url = self.extractor(url)
+        except Exception as e:
+            print(f"Error resolving {url}: {str(e)}")
+        finally:
+            with self.lock:
+                if stream_url:
+                    expires_at = self.expiry(stream_url)
+                    self.cache[key] = (stream_url, expires_at)
+                    self._schedule_refresh(key, url, expires_at)
+                self.threads.pop(key, None)
+                event = self.events.pop(key)
+            event.set()
+
+    def _schedule_refresh(self, key, url, expires_at):
+        # Refresh ahead of expiry, but only for sources that were used since the last resolution
+        previous = self.timers.pop(key, None)
+        if previous is not None:
+            previous.cancel()
+        remaining = expires_at - time.monotonic()
+        delay = max(remaining / 2, remaining - self.refresh_margin, 0.0)
+        timer = self.timers[key] = threading.Timer(delay, self._refresh, args=(key, url))
+        timer.daemon = True
+        timer.start()
+
+    def _refresh(self, key, url):
+        with self.lock:
+            self.timers.pop(key, None)
+            if key not in self.used:
+                self.cache.pop(key, None)
+                return
+            self.used.discard(key)
+        self._start(key, url)
+
+    def close(self):
+        with self.lock:
+            timers = list(self.timers.values())
+            self.timers.clear()
+        for timer in timers:
+            timer.cancel()
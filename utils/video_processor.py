@@ -1,58 +1,185 @@
 import cv2
-import numpy as np
-from datetime import datetime
+import os
 import re
-import time
-from ultralytics import YOLO
-try:
-    import yt_dlp
-except ImportError:
-    print("Please install yt-dlp: pip install yt-dlp")
+import numpy as np
+from urllib.parse import urlsplit, urlunsplit
+from utils.model_loader import ModelLoader
+from utils.stream_reader import StreamReader
+from utils.ffmpeg_capture import FFmpegCapture
+from utils.url_resolver import UrlResolver
+from utils.inference_engine import ProcessInferenceEngine
+from utils.analyzers import ANALYZERS, AnalysisFrame
+from utils.motion_gate import MotionGate
+from utils.stage_timer import StageTimer, NULL_STAGE_TIMER
+from utils.metrics import MetricsRegistry, MetricsServer
+from utils.clip_recorder import EventRecorder
+from utils.event_store import EventStore
+from utils.roi import parse_rois
+from utils.timeseries import TimeSeriesStore
+
+# The five cameras of a single store; each runs the analyzer of the same name
+DEFAULT_STREAMS = ['cash_drawer', 'employee_detection', 'door_detection', 'people_counting', 'face_recognition']
 
 class VideoProcessor:
-    def __init__(self):
-        self.streams = {
-            'cash_drawer': None,
-            'employee_detection': None,
-            'door_detection': None,
-            'people_counting': None,
-            'face_recognition': None
-        }
-        self.results = {
-            'cash_drawer': False,
-            'employee_detection': True,
-            'door_detection': {'detected': False, 'status': 'Unknown', 'movement': None},
-            'people_counting': {'male': 0, 'female': 0, 'total': 0},
-            'face_recognition': []
-        }
-        # Load the YOLOv8 model for door detection
-        self.door_model = YOLO('door_detection.pt')
-        
-        # Load face detection model
-        self.face_net = cv2.dnn.readNetFromCaffe("deploy.prototxt", "res10_300x300_ssd_iter_140000.caffemodel")
-        
-        # Load gender detection model
-        self.gender_net = cv2.dnn.readNetFromCaffe("gender_deploy.prototxt", "gender_net.caffemodel")
-        
-        self.gender_list = ['Male', 'Female']
-        
-        self.previous_door_box = None
-        self.door_movement_threshold = 5  # pixels
+    def __init__(self, models=None, warmup_models=True):
+        # models can substitute stand-ins for 'door_model', 'face_net' and 'gender_net'
         self.frame_size = (640, 480)  # Set a fixed frame size
-        self.previous_door_frame = None
-        self.motion_threshold = 1000  # Adjust this value to fine-tune motion detection sensitivity
+
+        # Models load in the background the first time a stream that needs them gets a camera
+        self.model_loader = ModelLoader(models, warmup=warmup_models)
+
+        # Analyzer instances are shared by every stream that uses them; per-camera state is kept separately
+        self.analyzers = {}
+        self.stream_analyzers = {}
+        self.stream_states = {}
+        self.detection_settings = {}
+        # Detectors only see these regions of each camera, cropped from the native frame; see set_rois
+        self.stream_rois = {}
+
+        self.streams = {}
+        # Streams whose sources normalize to the same key share one reader: one connection, one decode
+        self.shared_streams = {}
+        # results holds each stream's primary (first) analyzer result; stream_results holds all of them
+        self.results = {}
+        self.stream_results = {}
+
+        # Each frame is analyzed once; the result is cached and pushed to subscribers
+        self.frame_seq = {}
+        self.latest_frames = {}
+        self.subscribers = {}
+
+        # Static scenes skip inference and reuse the last results; the live frame is still shown,
+        # with the last analyzed frame's annotations copied onto it
+        self.motion_gates = {}
+        self.motion_gate_settings = {}  # stream -> (enabled, settings) as last given to set_motion_gate
+        self.gated_frames = {}
+
+        # 'opencv' decodes at native resolution; 'ffmpeg' scales inside the decoder, see set_capture_backend
+        self.capture_backend = 'opencv'
+        self.capture_fps = None
+        # Network cameras that deliver nothing for this many seconds are reconnected
+        self.read_timeout = 5.0
+        # YouTube pages resolve to expiring stream URLs; resolution runs off the caller's thread
+        self.url_resolver = UrlResolver(self.get_youtube_stream_url, cache_key=self.source_key)
+
+        # None runs analytics in this process; see set_inference_engine
+        self.inference_engine = None
+
+        # Optional sink(stream_name, stage, seconds) that receives per-stage timings
+        self.stage_sink = None
+        self.metrics = None
+        self.metrics_server = None
+        # listener(stream_name, analyzer_name, event) for events reported by analyzers; see set_stream_results
+        self.event_listeners = []
+        # Pre/post-event clips and the persistent alert/event history; see enable_recording and enable_event_store
+        self.recorder = None
+        self.event_store = None
+        # Fixed-memory history of each stream's numeric results; see enable_timeseries
+        self.timeseries = None
+
+        for stream_name in DEFAULT_STREAMS:
+            self.add_stream(stream_name)
+
+    def get_analyzer(self, analyzer_name):
+        analyzer = self.analyzers.get(analyzer_name)
+        if analyzer is None:
+            if analyzer_name not in ANALYZERS:
+                raise ValueError(f"Unknown analyzer: {analyzer_name}")
+            analyzer = self.analyzers[analyzer_name] = ANALYZERS[analyzer_name](self.model_loader, self.frame_size)
+        return analyzer
+
+    def add_stream(self, stream_name, analyzers=None):
+        analyzer_names = list(analyzers or [stream_name])
+        for analyzer_name in analyzer_names:
+            self.get_analyzer(analyzer_name)
+
+        self.stream_analyzers[stream_name] = analyzer_names
+        self.streams.setdefault(stream_name, None)
+        self.frame_seq.setdefault(stream_name, 0)
+        self.subscribers.setdefault(stream_name, [])
+        self.motion_gates.setdefault(stream_name, MotionGate())
+        self.reset_stream_state(stream_name)
+        if self.recorder is not None:
+            self.recorder.add_stream(stream_name)
+
+    def stream_models(self, stream_name):
+        names = []
+        for analyzer_name in self.stream_analyzers.get(stream_name, []):
+            for name in self.analyzers[analyzer_name].models:
+                if name not in names:
+                    names.append(name)
+        return names
+
+    @property
+    def door_model(self):
+        return self.model_loader.get('door_model')
+
+    @property
+    def face_net(self):
+        return self.model_loader.get('face_net')
+
+    @property
+    def gender_net(self):
+        return self.model_loader.get('gender_net')
+
+    def request_models(self, stream_name, wait=False, retry=False):
+        # Models that failed to load are retried only with retry, or once the loader's retry_delay has passed
+        for name in self.stream_models(stream_name):
+            if wait:
+                self.model_loader.wait(name)
+            else:
+                self.model_loader.request(name, retry=retry)
+
+    def models_ready(self, stream_name):
+        return all(self.model_loader.get(name) is not None for name in self.stream_models(stream_name))
+
+    def failed_models(self, stream_name):
+        return [name for name in self.stream_models(stream_name) if self.model_loader.failed(name)]
 
     def is_youtube_url(self, url):
+        return self.youtube_video_id(url) is not None
+
+    def youtube_video_id(self, url):
         youtube_regex = (
             r'(https?://)?(www\.)?'
             '(youtube|youtu|youtube-nocookie)\.(com|be)/'
             '(watch\?v=|embed/|v/|.+\?v=)?([^&=%\?]{11})')
-        return bool(re.match(youtube_regex, url))
+        match = re.match(youtube_regex, url)
+        return match.group(6) if match else None
+
+    def source_key(self, source):
+        # Different spellings of the same camera, file or video map to one key
+        if isinstance(source, int) or (isinstance(source, str) and source.isdigit()):
+            return f"device:{int(source)}"
+        video_id = self.youtube_video_id(source)
+        if video_id:
+            return f"youtube:{video_id}"
+        parts = urlsplit(source)
+        if parts.scheme and parts.netloc:
+            host = parts.hostname or ''
+            if ':' in host:
+                host = f"[{host}]"  # IPv6
+            default_ports = {'rtsp': 554, 'http': 80, 'https': 443}
+            try:
+                port = parts.port
+            except ValueError:
+                port = None
+            if port and port != default_ports.get(parts.scheme.lower()):
+                host += f":{port}"
+            credentials = parts.netloc.rpartition('@')[0]
+            netloc = f"{credentials}@{host}" if credentials else host
+            return urlunsplit((parts.scheme.lower(), netloc, parts.path.rstrip('/'), parts.query, ''))
+        return os.path.abspath(source)
 
     def get_youtube_stream_url(self, url):
+        try:
+            import yt_dlp
+        except ImportError:
+            print("Please install yt-dlp: pip install yt-dlp")
+            return None
         try:
             ydl_opts = {
-                'format': 'best[ext=mp4]',
+                'format': 'best[ext=mp4]/best',  # Live streams only offer HLS
                 'quiet': True,
             }
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
@@ -69,209 +196,442 @@ class VideoProcessor:
                 if camera_input.isdigit():
                     camera_input = int(camera_input)
                 elif self.is_youtube_url(camera_input):
-                    camera_input = self.get_youtube_stream_url(camera_input)
-                    if not camera_input:
-                        return False
+                    return self.set_youtube_stream(stream_name, camera_input)
                 elif camera_input.lower().startswith('rtsp://'):
                     return self.set_rtsp_stream(stream_name, camera_input)
 
+            key = self.source_key(camera_input)
+            if self.attach_shared_stream(stream_name, key):
+                return True
+
             # Create video capture object
-            new_cap = cv2.VideoCapture(camera_input)
+            # Local devices deliver frames in real time; files and HTTP sources get paced
+            paced = not isinstance(camera_input, int)
+            new_cap = self.open_capture(camera_input, realtime=paced)
             if new_cap.isOpened():
-                if self.streams[stream_name]:
-                    self.streams[stream_name].release()
-                self.streams[stream_name] = new_cap
+                self.attach_stream(stream_name, key, StreamReader(new_cap, stream_name, paced=paced))
                 return True
+            new_cap.release()
             return False
         except Exception as e:
             print(f"Error setting camera: {str(e)}")
             return False
 
+    def attach_shared_stream(self, stream_name, key):
+        # Another stream already reads this source: share its connection and decoded frames
+        reader = self.shared_streams.get(key)
+        if reader is None or not reader.running:
+            return False
+        self.attach_stream(stream_name, key, reader)
+        return True
+
+    def attach_stream(self, stream_name, key, reader):
+        # Attach before releasing the old view, so re-selecting the same source keeps the reader alive
+        view = reader.attach(stream_name)
+        previous, self.streams[stream_name] = self.streams[stream_name], view
+        if previous:
+            previous.release()
+        if key is not None:
+            self.shared_streams[key] = reader
+        # Readers whose last stream let go have stopped
+        for stale in [k for k, r in self.shared_streams.items() if not r.running]:
+            del self.shared_streams[stale]
+        self.reset_stream_state(stream_name)
+        # A new camera is the user's cue to try models that failed before, e.g. after adding the weights.
+        # Inference workers load their own models on the stream's first frame; this process never runs them.
+        if self.inference_engine is None:
+            self.request_models(stream_name, retry=True)
+
+    def set_supervised_stream(self, stream_name, open_capture, paced=False, key=None):
+        # Returns at once: the capture thread connects, and reconnects after drops, in the background
+        if key is not None and self.attach_shared_stream(stream_name, key):
+            return
+        reader = StreamReader(None, stream_name, paced=paced, open_capture=open_capture,
+                              stall_timeout=self.read_timeout)
+        self.attach_stream(stream_name, key, reader)
+
     def set_rtsp_stream(self, stream_name, rtsp_url):
         try:
-            # RTSP-specific options
-            new_cap = cv2.VideoCapture(rtsp_url, cv2.CAP_FFMPEG)
-            new_cap.set(cv2.CAP_PROP_BUFFERSIZE, 3)  # Set buffer size
-            new_cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('M','J','P','G'))
-            new_cap.set(cv2.CAP_PROP_FPS, 30)  # Adjust FPS if needed
-
-            # Try to read a frame to confirm the connection
-            retry_count = 0
-            max_retries = 5
-            while retry_count < max_retries:
-                ret, frame = new_cap.read()
-                if ret:
-                    if self.streams[stream_name]:
-                        self.streams[stream_name].release()
-                    self.streams[stream_name] = new_cap
-                    print(f"Successfully connected to RTSP stream for {stream_name}")
-                    return True
-                retry_count += 1
-                time.sleep(1)  # Wait for 1 second before retrying
-
-            print(f"Failed to connect to RTSP stream for {stream_name} after {max_retries} attempts")
-            return False
+            self.set_supervised_stream(stream_name, lambda: self.open_capture(rtsp_url),
+                                       key=self.source_key(rtsp_url))
+            print(f"Connecting to RTSP stream for {stream_name}")
+            return True
         except Exception as e:
             print(f"Error setting RTSP stream: {str(e)}")
             return False
 
-    def detect_motion(self, current_frame, previous_frame, door_box):
-        if previous_frame is None:
+    def set_youtube_stream(self, stream_name, url):
+        connections = [0]
+
+        def open_capture():
+            # Runs on the capture thread. A reconnect means the stream failed, and the likeliest
+            # cause is an expired URL, so it is resolved again
+            if connections[0]:
+                self.url_resolver.invalidate(url)
+            connections[0] += 1
+            stream_url = self.url_resolver.resolve(url, wait=True)
+            return self.open_capture(stream_url, realtime=True) if stream_url else None
+
+        try:
+            self.url_resolver.resolve(url)  # Start resolving before the capture thread is up
+            self.set_supervised_stream(stream_name, open_capture, paced=True, key=self.source_key(url))
+            print(f"Resolving YouTube stream for {stream_name}")
+            return True
+        except Exception as e:
+            print(f"Error setting YouTube stream: {str(e)}")
             return False
 
-        # Extract the door region from both frames
-        x1, y1, x2, y2 = map(int, door_box)
-        current_door = current_frame[y1:y2, x1:x2]
-        previous_door = previous_frame[y1:y2, x1:x2]
+    def get_connection_status(self, stream_name):
+        stream = self.streams[stream_name]
+        if stream is None:
+            return {'state': 'no_camera', 'uptime': 0.0, 'reconnects': 0}
+        return {'state': stream.connection_state(), 'uptime': stream.uptime(), 'reconnects': stream.reconnects}
 
-        # Convert to grayscale
-        current_gray = cv2.cvtColor(current_door, cv2.COLOR_BGR2GRAY)
-        previous_gray = cv2.cvtColor(previous_door, cv2.COLOR_BGR2GRAY)
+    def set_capture_backend(self, backend, fps=None):
+        # Applies to cameras opened afterwards; fps decimates in the decoder (ffmpeg only)
+        if backend not in ('opencv', 'ffmpeg'):
+            raise ValueError(f"Unknown capture backend: {backend}")
+        self.capture_backend = backend
+        self.capture_fps = fps
 
-        # Calculate the absolute difference
-        frame_delta = cv2.absdiff(previous_gray, current_gray)
-        thresh = cv2.threshold(frame_delta, 25, 255, cv2.THRESH_BINARY)[1]
-        thresh = cv2.dilate(thresh, None, iterations=2)
+    def open_capture(self, source, realtime=False):
+        # Device indexes always go through OpenCV
+        if self.capture_backend == 'ffmpeg' and not isinstance(source, int):
+            return FFmpegCapture(source, self.frame_size, self.capture_fps, realtime=realtime,
+                                 timeout=self.read_timeout)
+        if isinstance(source, str) and source.lower().startswith('rtsp://'):
+            # Bounded open and read so a dead camera fails the read instead of hanging the capture thread;
+            # the camera's own codec and frame rate are used as-is
+            timeout_ms = int(self.read_timeout * 1000)
+            capture = cv2.VideoCapture(source, cv2.CAP_FFMPEG, [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms,
+                                                                cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms])
+            capture.set(cv2.CAP_PROP_BUFFERSIZE, 3)  # Set buffer size
+            return capture
+        return cv2.VideoCapture(source)
 
-        # Find contours
-        contours, _ = cv2.findContours(thresh.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    def reset_stream_state(self, stream_name):
+        # A new camera invalidates everything learned from the previous one
+        self.latest_frames[stream_name] = None
+        self.gated_frames[stream_name] = None
+        if self.motion_gates[stream_name] is not None:
+            self.motion_gates[stream_name].reset()
 
-        motion_detected = False
-        for contour in contours:
-            if cv2.contourArea(contour) > self.motion_threshold:
-                motion_detected = True
-                break
+        self.stream_states[stream_name] = {}
+        for analyzer_name in self.stream_analyzers[stream_name]:
+            state = self.analyzers[analyzer_name].create_state()
+            if stream_name in self.detection_settings and hasattr(state, 'scheduler'):
+                state.scheduler.interval, state.scheduler.min_confidence = self.detection_settings[stream_name]
+            self.stream_states[stream_name][analyzer_name] = state
+        self.set_stream_results(stream_name, {
+            analyzer_name: self.analyzers[analyzer_name].initial_result()
+            for analyzer_name in self.stream_analyzers[stream_name]
+        })
+        if self.inference_engine is not None:
+            # The worker holds the state that is actually used
+            self.inference_engine.configure(stream_name, 'reset')
 
-        return motion_detected
+    def set_stream_results(self, stream_name, analyzer_results, emit_events=False):
+        previous = self.stream_results.get(stream_name)
+        self.stream_results[stream_name] = analyzer_results
+        self.results[stream_name] = analyzer_results[self.stream_analyzers[stream_name][0]]
+        if not emit_events or previous is None or not self.event_listeners:
+            return
+        for analyzer_name, result in analyzer_results.items():
+            if analyzer_name not in previous:
+                continue
+            for event in self.analyzers[analyzer_name].events(previous[analyzer_name], result):
+                for listener in list(self.event_listeners):
+                    listener(stream_name, analyzer_name, event)
+
+    def schedulers(self, stream_name):
+        states = self.stream_states.get(stream_name, {}).values()
+        return [state.scheduler for state in states if hasattr(state, 'scheduler')]
+
+    def set_detection_schedule(self, stream_name, interval, min_confidence=None):
+        schedulers = self.schedulers(stream_name)
+        if min_confidence is None:
+            min_confidence = schedulers[0].min_confidence if schedulers else 0.6
+        interval = max(1, int(interval))
+        self.detection_settings[stream_name] = (interval, min_confidence)
+        for scheduler in schedulers:
+            scheduler.interval = interval
+            scheduler.min_confidence = min_confidence
+        if self.inference_engine is not None:
+            self.inference_engine.configure(stream_name, 'schedule', interval=interval, min_confidence=min_confidence)
+
+    def set_rois(self, stream_name, rois):
+        # rois as parse_rois accepts them; empty runs the detectors on the whole frame again.
+        # Raises ValueError for malformed ROIs.
+        rois = parse_rois(rois)
+        if rois:
+            self.stream_rois[stream_name] = rois
+        else:
+            self.stream_rois.pop(stream_name, None)
+        # Boxes tracked from the old regions are stale: detect again on the next frame
+        for scheduler in self.schedulers(stream_name):
+            scheduler.frames_since_detection = None
+        self.gated_frames[stream_name] = None
+        if self.inference_engine is not None:
+            self.inference_engine.configure(stream_name, 'rois', rois=[roi.to_list() for roi in rois])
+        return rois
+
+    def get_detector_runs(self, stream_name):
+        return sum(scheduler.detector_runs for scheduler in self.schedulers(stream_name))
+
+    def set_motion_gate(self, stream_name, enabled=True, **settings):
+        self.motion_gate_settings[stream_name] = (enabled, settings)
+        self.motion_gates[stream_name] = MotionGate(**settings) if enabled else None
+        if self.inference_engine is not None:
+            self.inference_engine.configure(stream_name, 'gate', enabled=enabled, settings=settings)
+
+    def get_skipped_inferences(self, stream_name):
+        gate = self.motion_gates[stream_name]
+        return gate.skipped_frames if gate else 0
+
+    def subscribe(self, stream_name, callback):
+        # callback(seq, frame, detections) is called once for every analyzed frame
+        self.subscribers[stream_name].append(callback)
+
+    def unsubscribe(self, stream_name, callback):
+        if callback in self.subscribers[stream_name]:
+            self.subscribers[stream_name].remove(callback)
+
+    def set_inference_engine(self, engine_type, num_workers=None):
+        if self.inference_engine is not None:
+            self.inference_engine.close()
+            self.inference_engine = None
+        if engine_type == 'process':
+            # Covers the streams registered so far; add streams before selecting this engine
+            self.inference_engine = ProcessInferenceEngine(dict(self.stream_analyzers), self.frame_size, num_workers)
+            # Workers start from defaults; bring them up to the settings made so far
+            for stream_name, rois in self.stream_rois.items():
+                self.inference_engine.configure(stream_name, 'rois', rois=[roi.to_list() for roi in rois])
+            for stream_name, (interval, min_confidence) in self.detection_settings.items():
+                self.inference_engine.configure(stream_name, 'schedule', interval=interval,
+                                                min_confidence=min_confidence)
+            for stream_name, (enabled, settings) in self.motion_gate_settings.items():
+                self.inference_engine.configure(stream_name, 'gate', enabled=enabled, settings=settings)
+        elif engine_type != 'in_process':
+            raise ValueError(f"Unknown inference engine: {engine_type}")
+
+    def poll(self):
+        # Analyze every stream that has a new frame and fan the result out
+        new_frames = 0
+        for stream_name in list(self.streams):
+            if self.update_stream(stream_name):
+                new_frames += 1
+        self.collect_results()
+        return new_frames
+
+    def update_stream(self, stream_name):
+        if self.streams[stream_name] is None:
+            return False
+
+        # Non-blocking: the capture thread keeps only the newest decoded frame
+        ret, frame = self.streams[stream_name].read()
+        if not ret:
+            return False
+
+        self.frame_seq[stream_name] += 1
+        seq = self.frame_seq[stream_name]
+        if self.inference_engine is not None:
+            # Results come back asynchronously through collect_results
+            return self.inference_engine.submit(stream_name, seq, frame)
+
+        rgb_frame, detections = self.analyze_frame(stream_name, frame)
+        self.publish(stream_name, seq, rgb_frame, detections)
+        return True
+
+    def collect_results(self):
+        if self.inference_engine is None:
+            return
+        for stream_name, seq, rgb_frame, analyzer_results, detections in self.inference_engine.collect():
+            self.set_stream_results(stream_name, analyzer_results, emit_events=True)
+            self.publish(stream_name, seq, rgb_frame, detections)
+
+    def publish(self, stream_name, seq, rgb_frame, detections):
+        timer = self.stage_timer(stream_name)
+        self.latest_frames[stream_name] = (seq, rgb_frame, detections)
+        if self.timeseries is not None:
+            # Recorded per published frame, so frames the motion gate skipped still count
+            self.record_metrics(stream_name)
+        for callback in list(self.subscribers[stream_name]):
+            callback(seq, rgb_frame, detections)
+        # Subscribers are the GUI widgets, so this is the rendering cost
+        timer.mark('render')
+
+    def enable_metrics(self, port=9108, host='127.0.0.1'):
+        # Prometheus text format on http://host:port/metrics
+        if self.metrics is None:
+            self.metrics = MetricsRegistry(self)
+            self.stage_sink = self.metrics.observe_stage
+        if self.metrics_server is None:
+            self.metrics_server = MetricsServer(self.metrics, port, host)
+        return self.metrics_server.port
+
+    def enable_recording(self, output_dir='clips', pre_seconds=5.0, post_seconds=5.0, **settings):
+        # Writes pre-roll + post-roll clips to output_dir when an analyzer reports an event
+        if self.recorder is None:
+            self.recorder = EventRecorder(self, output_dir, pre_seconds=pre_seconds, post_seconds=post_seconds,
+                                          **settings)
+        return self.recorder
+
+    def enable_event_store(self, path='events.db'):
+        # Analyzer events go to a SQLite history that the Alerts tab and offline queries read from
+        if self.event_store is None:
+            self.event_store = EventStore(path)
+            self.event_listeners.append(self.store_event)
+        return self.event_store
+
+    def enable_timeseries(self, snapshot_path=None, snapshot_interval=60.0):
+        if self.timeseries is None:
+            self.timeseries = TimeSeriesStore(snapshot_path=snapshot_path, snapshot_interval=snapshot_interval)
+        return self.timeseries
+
+    def record_metrics(self, stream_name):
+        # Metrics are named analyzer.field, or just analyzer for plain results, e.g. 'people_counting.total'
+        metrics = {}
+        for analyzer_name, result in self.stream_results[stream_name].items():
+            for key, value in self.analyzers[analyzer_name].metrics(result).items():
+                metrics[analyzer_name if key == 'value' else f"{analyzer_name}.{key}"] = value
+        self.timeseries.record(stream_name, metrics)
+
+    def store_event(self, stream_name, analyzer_name, event):
+        self.event_store.add('detection', event, camera=stream_name, data={'analyzer': analyzer_name})
 
     def process_frame(self, stream_name):
         if self.streams[stream_name] is None:
             return None, []
 
-        ret, frame = self.streams[stream_name].read()
-        if ret:
-            # Resize the frame to a fixed size
+        # Repeated calls for the same frame return the cached analysis
+        self.update_stream(stream_name)
+        self.collect_results()
+        latest = self.latest_frames[stream_name]
+        if latest is None:
+            return None, []
+        _, rgb_frame, detections = latest
+        return rgb_frame, detections
+
+    def stage_timer(self, stream_name):
+        if self.stage_sink is None:
+            return NULL_STAGE_TIMER
+        return StageTimer(self.stage_sink, stream_name)
+
+    def analyze_frame(self, stream_name, frame):
+        timer = self.stage_timer(stream_name)
+        gate = self.motion_gates[stream_name]
+        # The gate is only consulted when a skip is possible, so it never counts a frame that gets analyzed
+        skip = gate is not None and self.gated_frames[stream_name] is not None and not gate.should_analyze(frame)
+        timer.mark('motion_gate')
+        if skip:
+            rgb_frame, detections = self.redraw_gated(stream_name, frame, timer)
+        else:
+            rgb_frame, detections = self.run_analytics(stream_name, frame, timer)
+        timer.total()
+        return rgb_frame, detections
+
+    def prepare_frame(self, frame, timer=NULL_STAGE_TIMER):
+        # Resize the frame to a fixed size, unless the decoder already delivered it at that size
+        if frame.shape[:2] != self.frame_size[::-1]:
             frame = cv2.resize(frame, self.frame_size, interpolation=cv2.INTER_AREA)
-            
-            if frame.shape[:2] != self.frame_size[::-1]:
-                print(f"Warning: Frame size mismatch. Expected {self.frame_size[::-1]}, got {frame.shape[:2]}")
-                frame = cv2.resize(frame, self.frame_size, interpolation=cv2.INTER_AREA)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            if stream_name == 'door_detection':
-                # Use the YOLOv8 model for door detection
-                results = self.door_model(rgb_frame)
-                
-                # Process the results
-                door_detected = len(results[0].boxes) > 0
-                self.results[stream_name]['detected'] = door_detected
-                
-                if door_detected:
-                    # Get the bounding box of the detected door
-                    box = results[0].boxes[0].xyxy[0].cpu().numpy()
-                    x1, y1, x2, y2 = map(int, box)
-                    
-                    # Draw bounding box on the frame
-                    cv2.rectangle(rgb_frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                    
-                    # Detect motion only within the door region
-                    motion_detected = self.detect_motion(frame, self.previous_door_frame, box)
-                    
-                    # Check for door movement
-                    if self.previous_door_box is not None:
-                        movement = np.mean(np.abs(box - self.previous_door_box))
-                        if movement > self.door_movement_threshold or motion_detected:
-                            self.results[stream_name]['movement'] = 'Moving'
-                            self.results[stream_name]['status'] = 'Opening/Closing'
-                        else:
-                            self.results[stream_name]['movement'] = 'Static'
-                            self.results[stream_name]['status'] = 'Open/Closed'
-                    else:
-                        self.results[stream_name]['movement'] = 'Unknown'
-                        self.results[stream_name]['status'] = 'Detected'
-                    
-                    self.previous_door_box = box
-                    
-                    # Add motion detection information
-                    if motion_detected:
-                        cv2.putText(rgb_frame, "Motion Detected", (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
-                else:
-                    self.results[stream_name]['movement'] = None
-                    self.results[stream_name]['status'] = 'Not Detected'
-                    self.previous_door_box = None
-                
-                self.previous_door_frame = frame
-            elif stream_name == 'people_counting':
-                blob = cv2.dnn.blobFromImage(cv2.resize(frame, (300, 300)), 1.0, (300, 300), (104.0, 177.0, 123.0))
-                self.face_net.setInput(blob)
-                detections = self.face_net.forward()
-                
-                male_count = 0
-                female_count = 0
-                
-                for i in range(detections.shape[2]):
-                    confidence = detections[0, 0, i, 2]
-                    if confidence > 0.5:
-                        box = detections[0, 0, i, 3:7] * np.array([frame.shape[1], frame.shape[0], frame.shape[1], frame.shape[0]])
-                        (x, y, x1, y1) = box.astype("int")
-                        
-                        face = frame[y:y1, x:x1]
-                        if face.shape[0] > 0 and face.shape[1] > 0:
-                            blob = cv2.dnn.blobFromImage(face, 1.0, (227, 227), (78.4263377603, 87.7689143744, 114.895847746), swapRB=False)
-                            self.gender_net.setInput(blob)
-                            gender_preds = self.gender_net.forward()
-                            gender = self.gender_list[gender_preds[0].argmax()]
-                            
-                            if gender == 'Male':
-                                male_count += 1
-                                color = (255, 0, 0)  # Blue for male
-                            else:
-                                female_count += 1
-                                color = (255, 0, 255)  # Pink for female
-                            
-                            cv2.rectangle(rgb_frame, (x, y), (x1, y1), color, 2)
-                            cv2.putText(rgb_frame, gender, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-                
-                self.results[stream_name] = {
-                    'male': male_count,
-                    'female': female_count,
-                    'total': male_count + female_count
-                }
-            elif stream_name == 'cash_drawer':
-                self.results[stream_name] = np.random.choice([True, False], p=[0.1, 0.9])
-            elif stream_name == 'employee_detection':
-                self.results[stream_name] = np.random.choice([True, False], p=[0.8, 0.2])
-            elif stream_name == 'face_recognition':
-                if np.random.random() < 0.1:
-                    self.results[stream_name].append({
-                        'name': f"Employee {np.random.randint(1, 100)}",
-                        'time': datetime.now().strftime("%H:%M:%S")
-                    })
-                    if len(self.results[stream_name]) > 5:
-                        self.results[stream_name].pop(0)
-
-            detections = self.get_detections(stream_name)
-            return rgb_frame, detections
-        return None, []
+        timer.mark('resize')
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        timer.mark('color_convert')
+        return frame, rgb_frame
+
+    def redraw_gated(self, stream_name, frame, timer=NULL_STAGE_TIMER):
+        # The current frame with the cached annotations drawn over it; no inference
+        overlay, annotated, detections = self.gated_frames[stream_name]
+        _, rgb_frame = self.prepare_frame(frame, timer)
+        np.copyto(rgb_frame, annotated, where=overlay)
+        timer.mark('annotate')
+        return rgb_frame, detections
+
+    def run_analytics(self, stream_name, frame, timer=NULL_STAGE_TIMER):
+        # The native frame is kept for detectors running on ROIs and for face crops
+        native = frame
+        frame, rgb_frame = self.prepare_frame(frame, timer)
+
+        if not self.models_ready(stream_name):
+            # Show the live feed while the models for this stream finish loading
+            self.request_models(stream_name)
+            failed = self.failed_models(stream_name)
+            if failed:
+                cv2.putText(rgb_frame, f"Models failed to load: {', '.join(failed)}", (10, 20),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (191, 97, 106), 2)
+            else:
+                cv2.putText(rgb_frame, "Loading models...", (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5,
+                            (235, 203, 139), 2)
+            timer.mark('annotate')
+            return rgb_frame, self.get_detections(stream_name)
+        
+        rois = self.stream_rois.get(stream_name)
+        analysis_frame = AnalysisFrame(frame, rgb_frame, native, rois)
+        analyzer_results = {}
+        for analyzer_name in self.stream_analyzers[stream_name]:
+            analyzer = self.analyzers[analyzer_name]
+            state = self.stream_states[stream_name][analyzer_name]
+            analyzer_results[analyzer_name] = analyzer.analyze(analysis_frame, state, timer)
+        self.set_stream_results(stream_name, analyzer_results, emit_events=True)
+        for roi in rois or []:
+            roi.draw(rgb_frame, (136, 192, 208))
+
+        detections = self.get_detections(stream_name)
+        # Pixels the analyzers drew on, so frames the motion gate skips can show the same annotations
+        overlay = np.any(rgb_frame != analysis_frame.clean_rgb, axis=2, keepdims=True)
+        self.gated_frames[stream_name] = (overlay, rgb_frame, detections)
+        timer.mark('postprocess')
+        return rgb_frame, detections
+
+    def enroll_face(self, stream_name, name):
+        # Adds the largest face currently in view on stream_name to the gallery under name
+        if self.inference_engine is not None:
+            print("Enrolling faces needs in-process analysis (no --inference-workers)")
+            return False
+        for analyzer_name in self.stream_analyzers.get(stream_name, []):
+            analyzer = self.analyzers[analyzer_name]
+            if hasattr(analyzer, 'enroll') and self.models_ready(stream_name):
+                try:
+                    return analyzer.enroll(self.stream_states[stream_name][analyzer_name], name) is not None
+                except Exception as e:
+                    print(f"Error enrolling face: {str(e)}")
+                    return False
+        return False
 
     def get_detections(self, stream_name):
         detections = []
-        if stream_name == 'door_detection':
-            if self.results[stream_name]['detected']:
-                detections.append(f"Door {self.results[stream_name]['status']}")
-                if self.results[stream_name]['movement']:
-                    detections.append(f"Movement: {self.results[stream_name]['movement']}")
-        elif stream_name == 'cash_drawer' and self.results[stream_name]:
-            detections.append("Cash drawer opened")
-        elif stream_name == 'employee_detection' and not self.results[stream_name]:
-            detections.append("No employee at cash drawer")
-        elif stream_name == 'people_counting':
-            detections.append(f"Male: {self.results[stream_name]['male']}")
-            detections.append(f"Female: {self.results[stream_name]['female']}")
-            detections.append(f"Total: {self.results[stream_name]['total']}")
+        for analyzer_name, result in self.stream_results[stream_name].items():
+            detections.extend(self.analyzers[analyzer_name].detections(result))
         return detections
 
+    def get_dropped_frames(self, stream_name):
+        stream = self.streams[stream_name]
+        return stream.dropped_frames if stream else 0
+
+    def get_inference_dropped_frames(self, stream_name):
+        # Frames dropped because the stream's inference worker was still busy with earlier ones
+        if self.inference_engine is None:
+            return 0
+        return self.inference_engine.dropped_frames.get(stream_name, 0)
+
     def release(self):
+        self.url_resolver.close()
+        if self.recorder is not None:
+            # Finishes any open clip
+            self.recorder.close()
+            self.recorder = None
+        if self.event_store is not None:
+            # Commits whatever is still queued
+            self.event_store.close()
+        if self.timeseries is not None:
+            # Writes a final snapshot
+            self.timeseries.close()
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+            self.metrics_server = None
+        if self.inference_engine is not None:
+            self.inference_engine.close()
+            self.inference_engine = None
         for stream in self.streams.values():
             if stream:
                 stream.release()
\ No newline at end of file